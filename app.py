@@ -35,10 +35,24 @@ image_to_text = st.Page(
     icon = ':material/monetization_on:',
     default = False
 )
+olist_explorer_page = st.Page(
+    page='views/olist_explorer.py',
+    title='Olist E-commerce Explorer',
+    icon=':material/shopping_cart:',
+    default=False
+)
+
+olist_dashboard_page = st.Page(
+    page='views/olist_dashboard.py',
+    title='Olist E-commerce Dashboard',
+    icon=':material/inventory_2:',
+    default=False
+)
+
 pg = st.navigation(
    {
        'About Me': [about_me],
-       'Projects': [population_metrics_dashboard_page, sales_dashboard_page, image_to_text],
+       'Projects': [population_metrics_dashboard_page, sales_dashboard_page, olist_explorer_page, olist_dashboard_page, image_to_text],
    }
         )
 st.logo('assets/logo1.png', link='https://github.com/scottyd254/personal_rfesume_dashboard')
@@ -0,0 +1,207 @@
+"""
+Headless rerun benchmarks for the app and every page, driven through Streamlit's AppTest.
+
+Each scenario renders a page against a dataset scale, then replays scripted
+interactions. Every step records its wall time, peak traced memory and the
+serialized size of the rendered element tree. Results are compared with a
+stored baseline, and the run exits non-zero when a step regresses.
+
+Usage (from the repository root)::
+
+    python -m benchmarks.bench_pages --save-baseline
+    python -m benchmarks.bench_pages --sales-rows 1000 1000000 10000000 --wards 31
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+os.chdir(ROOT)
+
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+from benchmarks import synthetic
+
+BASELINE_FILE = ROOT / 'benchmarks' / 'baseline.json'
+SECRETS = {
+    'GEMINI_API_KEY': 'benchmark',
+    'MODEL_NAME': 'benchmark',
+    'MODEL_BACKEND': 'fake',
+    'WEB_HOOK_URL': 'http://localhost/benchmark',
+}
+# absolute slack so that sub-millisecond noise never counts as a regression
+MIN_REGRESSION = {'wall_s': 0.05, 'peak_mb': 5.0, 'payload_kb': 10.0}
+
+
+def _set(widget, value):
+    return lambda at: widget(at).set_value(value)
+
+
+SALES_STEPS = [
+    ('first render', None),
+    ('section: Metrics', _set(lambda at: at.sidebar.radio[0], 'Metrics')),
+    ('section: Customer Insights', _set(lambda at: at.sidebar.radio[0], 'Customer Insights')),
+    ('filter: drop a category', lambda at: at.sidebar.multiselect[0].set_value(at.sidebar.multiselect[0].value[1:])),
+    ('section: Time-based Trends', _set(lambda at: at.sidebar.radio[0], 'Time-based Trends')),
+    ('section: Export to file', _set(lambda at: at.sidebar.radio[0], 'Export to file')),
+]
+
+POPULATION_STEPS = [
+    ('first render', None),
+    ('filter: first five regions', lambda at: at.multiselect[0].set_value(at.multiselect[0].options[:5])),
+    ('field: Male', lambda at: at.selectbox[0].set_value('Male')),
+    ('slider: raise minimum', lambda at: at.slider[0].set_value((at.slider[0].min + at.slider[0].max) // 2)),
+]
+
+IMAGE_STEPS = [
+    ('first render', None),
+    ('section: Upload Image', _set(lambda at: at.sidebar.radio[0], 'Upload Image')),
+]
+
+OLIST_EXPLORER_STEPS = [
+    ('first render', None),
+    ('section: Products', _set(lambda at: at.sidebar.radio[0], 'Products')),
+    ('filter: first five categories', lambda at: at.sidebar.multiselect[0].set_value(at.sidebar.multiselect[0].options[:5])),
+    ('section: Sellers', _set(lambda at: at.sidebar.radio[0], 'Sellers')),
+    ('filter: first three states', lambda at: at.sidebar.multiselect[1].set_value(at.sidebar.multiselect[1].options[:3])),
+]
+
+OLIST_DASHBOARD_STEPS = [
+    ('first render', None),
+    ('measure: product_length_cm', _set(lambda at: at.selectbox[0], 'product_length_cm')),
+    ('drill down: first category', lambda at: at.selectbox[2].set_value(at.selectbox[2].options[1])),
+    ('section: Sellers', _set(lambda at: at.sidebar.radio[0], 'Sellers')),
+    ('drill down: first state', lambda at: at.selectbox[0].set_value(at.selectbox[0].options[1])),
+]
+
+APP_STEPS = [
+    ('first render', None),
+]
+
+
+def payload_bytes(node):
+    """Return the serialized size of an element tree, in bytes."""
+    size = 0
+    proto = getattr(node, 'proto', None)
+    if proto is not None and hasattr(proto, 'ByteSize'):
+        size += proto.ByteSize()
+    for child in getattr(node, 'children', {}).values():
+        size += payload_bytes(child)
+    return size
+
+
+def scenarios(sales_rows, wards):
+    """Yield (name, script, environment, steps) for every benchmarked page and scale."""
+    yield 'app', 'app.py', {}, APP_STEPS
+    yield 'about_me', 'views/about_me.py', {}, APP_STEPS
+    yield 'image_to_txt', 'views/image_to_txt.py', {}, IMAGE_STEPS
+    yield 'olist_explorer', 'views/olist_explorer.py', {}, OLIST_EXPLORER_STEPS
+    yield 'olist_dashboard', 'views/olist_dashboard.py', {}, OLIST_DASHBOARD_STEPS
+    for n_rows in sales_rows:
+        csv_file = synthetic.SALES_SOURCE if n_rows <= 1000 else synthetic.sales_dataset(n_rows)
+        yield f'sales_dashboard[{n_rows}]', 'views/sales_dashboard.py', {'SALES_CSV_FILE': csv_file}, SALES_STEPS
+    yield 'population_dashboard[counties]', 'views/population_metrics_dashboard.py', {}, POPULATION_STEPS
+    for pieces in wards:
+        shp_file = synthetic.ward_geometry(pieces)
+        yield f'population_dashboard[wards x{pieces}]', 'views/population_metrics_dashboard.py', {'KENYA_GEO_SHP_FILE': shp_file}, POPULATION_STEPS
+
+
+def run_scenario(script, environment, steps, timeout):
+    """
+    Run one page headlessly from a cold cache and measure each step.
+
+    Returns
+    -------
+    dict
+        Step name mapped to its wall time, peak memory and payload size.
+    """
+    os.environ.update(environment)
+    for module in [name for name in sys.modules if name == 'utils' or name.startswith('utils.')]:
+        del sys.modules[module]
+    st.cache_data.clear()
+    st.cache_resource.clear()
+
+    # AppTest resolves a relative script against the calling file, not the working directory
+    at = AppTest.from_file(str(ROOT / script), default_timeout=timeout)
+    for key, value in SECRETS.items():
+        at.secrets[key] = value
+
+    results = {}
+    try:
+        for step, action in steps:
+            if action is not None:
+                action(at)
+            tracemalloc.start()
+            started = time.perf_counter()
+            at.run()
+            wall = time.perf_counter() - started
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            if at.exception:
+                raise RuntimeError(f'{script} failed at "{step}": {at.exception[0].message}')
+            results[step] = {
+                'wall_s': round(wall, 4),
+                'peak_mb': round(peak / 2**20, 2),
+                'payload_kb': round(payload_bytes(at._tree) / 1024, 1),
+            }
+    finally:
+        for key in environment:
+            os.environ.pop(key, None)
+    return results
+
+
+def regressions(results, baseline, tolerance):
+    """List the measurements that exceed their baseline by more than `tolerance`."""
+    failures = []
+    for name, measures in results.items():
+        for metric, value in measures.items():
+            reference = baseline.get(name, {}).get(metric)
+            if reference is None:
+                continue
+            if value > reference * (1 + tolerance) and value - reference > MIN_REGRESSION[metric]:
+                failures.append(f'{name} {metric}: {value} (baseline {reference})')
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sales-rows', type=int, nargs='*', default=[1000, 100_000, 1_000_000],
+                        help='Sales dataset sizes; 10000000 is the largest supported scale.')
+    parser.add_argument('--wards', type=int, nargs='*', default=[31],
+                        help='Wards per county for the synthetic sub-county geometry.')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='Allowed relative regression against the baseline.')
+    parser.add_argument('--timeout', type=float, default=600)
+    parser.add_argument('--save-baseline', action='store_true',
+                        help=f'Write the results to {BASELINE_FILE.name} instead of comparing.')
+    args = parser.parse_args(argv)
+
+    results = {}
+    for name, script, environment, steps in scenarios(args.sales_rows, args.wards):
+        for step, measures in run_scenario(script, environment, steps, args.timeout).items():
+            key = f'{name}::{step}'
+            results[key] = measures
+            print(f"{key:<60} {measures['wall_s']:>9.3f}s {measures['peak_mb']:>9.1f}MB {measures['payload_kb']:>10.1f}KB")
+
+    if args.save_baseline:
+        BASELINE_FILE.write_text(json.dumps(results, indent=2, sort_keys=True))
+        print(f'Baseline written to {BASELINE_FILE}')
+        return 0
+    if not BASELINE_FILE.exists():
+        print('No baseline stored yet; run with --save-baseline first.')
+        return 0
+
+    failures = regressions(results, json.loads(BASELINE_FILE.read_text()), args.tolerance)
+    for failure in failures:
+        print(f'REGRESSION {failure}')
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
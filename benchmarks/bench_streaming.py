@@ -0,0 +1,67 @@
+"""
+Time-to-first-text of blocking versus streamed extraction, against the local stub model.
+
+The blocking path waits for `OcrEngine.extract`; the streamed path runs an
+`ExtractionJob` and times its first chunk. A reader attaching mid-stream,
+as a page rerun does, is timed as well: it must replay the stored chunks
+at once instead of restarting the job.
+
+Usage (from the repository root)::
+
+    python -m benchmarks.bench_streaming --first-delay 0.5 --chunk-delay 0.05
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from utils.extraction_jobs import ExtractionJob
+from utils.ocr_engines import StubEngine
+
+
+def time_blocking(engine):
+    start = time.perf_counter()
+    engine.extract(b'')
+    return time.perf_counter() - start
+
+
+def time_streamed(engine):
+    job = ExtractionJob(engine, b'')
+    chunks = job.stream()
+    next(chunks)
+    first = time.perf_counter() - job.started
+    for _ in chunks:
+        pass
+    return first, job.finished_at - job.started
+
+
+def time_reattach(engine, after):
+    job = ExtractionJob(engine, b'')
+    time.sleep(after)
+    start = time.perf_counter()
+    replayed = next(job.stream())
+    return time.perf_counter() - start, len(replayed)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--first-delay', type=float, default=0.5)
+    parser.add_argument('--chunk-delay', type=float, default=0.05)
+    parser.add_argument('--words', type=int, default=400)
+    args = parser.parse_args(argv)
+
+    engine = StubEngine(text=' '.join(['lorem'] * args.words), first_delay=args.first_delay, chunk_delay=args.chunk_delay)
+    blocking = time_blocking(engine)
+    first, total = time_streamed(engine)
+    reattach, _ = time_reattach(engine, after=args.first_delay + 5 * args.chunk_delay)
+
+    print(f'blocking  first text {blocking:>8.3f} s')
+    print(f'streamed  first text {first:>8.3f} s   complete {total:.3f} s')
+    print(f'reattach  first text {reattach:>8.3f} s   (mid-stream rerun)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+"""
+Synthetic datasets for the page benchmarks, scaled up from the shipped files.
+"""
+import math
+import os
+
+import numpy as np
+import pandas as pd
+
+SALES_SOURCE = 'datasets/retail_sales_dataset.csv'
+COUNTIES_SOURCE = 'datasets/kenya-counties-geopandas-updated-merged.shp'
+OUTPUT_DIR = '.cache/benchmarks'
+CHUNK_ROWS = 1_000_000
+
+
+def sales_dataset(n_rows, seed=0, output_dir=OUTPUT_DIR):
+    """
+    Write a transactions CSV of `n_rows` rows resampled from the shipped dataset.
+
+    Rows are drawn with replacement, dates are jittered within the original
+    range and every row gets a new transaction and customer ID. Files are
+    written in chunks and reused when they already exist.
+
+    Parameters
+    ----------
+    n_rows : int
+        Number of transactions to generate.
+    seed : int
+        Seed of the random generator.
+    output_dir : str
+        Directory the CSV file is written to.
+
+    Returns
+    -------
+    str
+        Path of the generated CSV file.
+    """
+    path = os.path.join(output_dir, f'retail_sales_{n_rows}.csv')
+    if os.path.exists(path):
+        return path
+    os.makedirs(output_dir, exist_ok=True)
+
+    source = pd.read_csv(SALES_SOURCE, parse_dates=['Date'])
+    first_day = source['Date'].min()
+    span_days = (source['Date'].max() - first_day).days
+    rng = np.random.default_rng(seed)
+
+    tmp_path = f'{path}.tmp'
+    for start in range(0, n_rows, CHUNK_ROWS):
+        size = min(CHUNK_ROWS, n_rows - start)
+        chunk = source.iloc[rng.integers(0, len(source), size)].reset_index(drop=True)
+        ids = np.arange(start + 1, start + size + 1)
+        chunk['Transaction ID'] = ids
+        chunk['Customer ID'] = [f'CUST{i:08d}' for i in ids]
+        chunk['Date'] = (first_day + pd.to_timedelta(rng.integers(0, span_days + 1, size), unit='D')).strftime('%Y-%m-%d')
+        chunk.to_csv(tmp_path, mode='a' if start else 'w', header=start == 0, index=False)
+    os.replace(tmp_path, path)
+    return path
+
+
+def ward_geometry(pieces_per_county, output_dir=OUTPUT_DIR):
+    """
+    Write a shapefile that splits every county into roughly `pieces_per_county` wards.
+
+    Each county polygon is cut along a regular grid; population counts are
+    shared out by area so that wards sum back to their county.
+
+    Parameters
+    ----------
+    pieces_per_county : int
+        Target number of wards per county. 31 gives roughly 1,450 wards.
+    output_dir : str
+        Directory the shapefile is written to.
+
+    Returns
+    -------
+    str
+        Path of the generated shapefile.
+    """
+    import geopandas as gpd
+    from shapely.geometry import box
+
+    path = os.path.join(output_dir, f'kenya_wards_{pieces_per_county}.shp')
+    if os.path.exists(path):
+        return path
+    os.makedirs(output_dir, exist_ok=True)
+
+    counties = gpd.read_file(COUNTIES_SOURCE)
+    cells_per_side = math.ceil(math.sqrt(pieces_per_county))
+    wards = []
+    for county in counties.itertuples():
+        minx, miny, maxx, maxy = county.geometry.bounds
+        width = (maxx - minx) / cells_per_side
+        height = (maxy - miny) / cells_per_side
+        pieces = []
+        for i in range(cells_per_side):
+            for j in range(cells_per_side):
+                cell = box(minx + i * width, miny + j * height, minx + (i + 1) * width, miny + (j + 1) * height)
+                piece = county.geometry.intersection(cell)
+                if not piece.is_empty and piece.area > 0:
+                    pieces.append(piece)
+        total_area = sum(piece.area for piece in pieces)
+        for number, piece in enumerate(pieces, start=1):
+            share = piece.area / total_area
+            wards.append({
+                'County': f'{county.County} {number}',
+                'Male': round(county.Male * share),
+                'Female': round(county.Female * share),
+                'Intersex': round(county.Intersex * share),
+                'Total': round(county.Total * share),
+                'Percentage': county.Percentage * share,
+                'PERIMETER': piece.length,
+                'AREA': county.AREA * share,
+                'OBJECTID': len(wards) + 1,
+                'geometry': piece,
+            })
+
+    gpd.GeoDataFrame(wards, crs=counties.crs).to_file(path)
+    return path
@@ -0,0 +1,36 @@
+from pathlib import Path
+
+import pandas as pd
+
+from utils.sales_stream import SalesAggregator
+
+SALES_CSV = Path(__file__).resolve().parents[1] / 'datasets' / 'retail_sales_dataset.csv'
+
+
+def _totals(aggregator):
+    cells = aggregator.refresh().cells()
+    return aggregator.rows, cells['Total Amount'].sum(), cells['Transactions'].sum()
+
+
+def test_last_line_without_newline_is_counted(tmp_path):
+    csv_file = tmp_path / 'sales.csv'
+    csv_file.write_bytes(SALES_CSV.read_bytes().rstrip(b'\r\n'))
+    expected = pd.read_csv(csv_file)
+
+    assert _totals(SalesAggregator(str(csv_file))) == (
+        len(expected), expected['Total Amount'].sum(), len(expected))
+
+
+def test_completed_last_line_is_not_counted_twice(tmp_path):
+    csv_file = tmp_path / 'sales.csv'
+    lines = SALES_CSV.read_bytes().rstrip(b'\r\n').split(b'\n')
+    last = lines[-1]
+    # the writer stopped halfway through the last row, then finished it
+    csv_file.write_bytes(b'\n'.join(lines[:-1]) + b'\n' + last[:len(last) // 2])
+    aggregator = SalesAggregator(str(csv_file))
+    aggregator.refresh()
+    with open(csv_file, 'ab') as f:
+        f.write(last[len(last) // 2:] + b'\n')
+    expected = pd.read_csv(csv_file)
+
+    assert _totals(aggregator) == (len(expected), expected['Total Amount'].sum(), len(expected))
@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+
+
+def sum_by(df, keys, value='Total Amount'):
+    """
+    Sum a value column per group, ready to be plotted.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        The rows to aggregate.
+    keys : list of str
+        The grouping columns.
+    value : str
+        The column to sum.
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per observed group, with the key columns and the summed value.
+    """
+    return df.groupby(keys, observed=True)[value].sum().reset_index()
+
+
+def count_by(df, column):
+    """
+    Count rows per value of a column.
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per value, with the column and a "count" column.
+    """
+    return df[column].value_counts(sort=False).sort_index().rename('count').reset_index()
+
+
+def histogram(series, nbins):
+    """
+    Bin a numeric column into equal-width bins.
+
+    Parameters
+    ----------
+    series : pd.Series
+        The values to bin.
+    nbins : int
+        Number of bins.
+
+    Returns
+    -------
+    tuple of (pd.DataFrame, float)
+        The bin centers (named after the series) with their "count", and
+        the bin width.
+    """
+    counts, edges = np.histogram(series.dropna(), bins=nbins)
+    centers = (edges[:-1] + edges[1:]) / 2
+    frame = pd.DataFrame({series.name: centers, 'count': counts})
+    return frame, edges[1] - edges[0]
@@ -0,0 +1,112 @@
+import os
+import shutil
+import threading
+from pathlib import Path
+
+import streamlit.components.v1 as components
+
+COMPONENT_DIR = Path(__file__).resolve().parents[1] / 'components' / 'choropleth'
+GEOMETRY_DIR = COMPONENT_DIR / 'geometry'
+PLOTLY_JS = COMPONENT_DIR / 'vendor' / 'plotly.min.js'
+
+_choropleth = components.declare_component('choropleth', path=str(COMPONENT_DIR))
+
+
+def _publish(source, published):
+    """Copy a file under the component directory through a process- and thread-unique temporary file."""
+    published.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = published.with_name(f'{published.name}.{os.getpid()}.{threading.get_ident()}.tmp')
+    shutil.copyfile(source, tmp_file)
+    os.replace(tmp_file, published)
+
+
+def publish_plotly_js():
+    """
+    Serve the plotly.js bundle of the installed plotly package next to the component.
+
+    The map then loads no third-party script at runtime, so it works
+    offline and under a restrictive content security policy.
+    """
+    import plotly
+
+    bundle = Path(plotly.__file__).parent / 'package_data' / 'plotly.min.js'
+    if not PLOTLY_JS.exists() or PLOTLY_JS.stat().st_size != bundle.stat().st_size:
+        _publish(bundle, PLOTLY_JS)
+
+
+def publish_geometry(artifact):
+    """
+    Expose a GeoJSON artifact to the component frontend.
+
+    Files under the component directory are served next to its
+    `index.html`; artifact names embed the source version, so the browser
+    can cache them for as long as it likes.
+
+    Parameters
+    ----------
+    artifact : Path
+        GeoJSON file returned by `utils.geometry.geojson_artifact`.
+
+    Returns
+    -------
+    str
+        URL of the geometry, relative to the component page.
+    """
+    artifact = Path(artifact)
+    published = GEOMETRY_DIR / artifact.name
+    if not published.exists():
+        _publish(artifact, published)
+        for stale in GEOMETRY_DIR.glob(f"{artifact.name.rsplit('-', 1)[0]}-*.geojson"):
+            if stale != published and stale.name.rsplit('-', 1)[0] == artifact.name.rsplit('-', 1)[0]:
+                stale.unlink(missing_ok=True)
+    return f'geometry/{published.name}'
+
+
+def choropleth_map(geometry_url, frame, field, hover_fields, name_field, title, width, height, key):
+    """
+    Render a choropleth whose geometry is sent to the browser only once.
+
+    The first render downloads the geometry and draws the map; later
+    renders with the same `key` and `geometry_url` only send the value
+    vector, hover data and colorbar ticks, and restyle the existing map.
+
+    Parameters
+    ----------
+    geometry_url : str
+        URL returned by `publish_geometry`.
+    frame : pd.DataFrame
+        One row per region; the index matches the GeoJSON feature ids.
+    field : str
+        Column used to color the regions.
+    hover_fields : list of str
+        Columns shown on hover.
+    name_field : str
+        Column holding the region name.
+    title : str
+        Map title.
+    width, height : int
+        Map size in pixels.
+    key : str
+        Widget key; keep it stable so the frontend is reused across reruns.
+    """
+    publish_plotly_js()
+    values = frame[field]
+    hovertemplate = '<b>%{text}</b><br>' + '<br>'.join(
+        f'{hover_field}=%{{customdata[{i}]}}' for i, hover_field in enumerate(hover_fields)
+    ) + '<extra></extra>'
+    return _choropleth(
+        geometry_url=geometry_url,
+        locations=[str(location) for location in frame.index],
+        values=values.tolist(),
+        names=frame[name_field].astype(str).tolist(),
+        hover=frame[hover_fields].values.tolist(),
+        hovertemplate=hovertemplate,
+        colorbar_title=field,
+        tickvals=[values.min().item(), values.max().item()],
+        ticktext=[f'{values.min()}', f'{values.max()}'],
+        title=title,
+        width=width,
+        height=height,
+        key=key,
+        default=None,
+    )
@@ -0,0 +1,154 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+COMPACT_DTYPES = os.environ.get('COMPACT_DTYPES', '0').lower() in ('1', 'true', 'yes')
+CATEGORY_MAX_RATIO = 0.5
+HEX_ID_PATTERN = r'[0-9a-fA-F]{32}'
+
+# dataset name -> memory report of its last compact load
+MEMORY_REPORTS = {}
+
+
+def _is_hex_id(values):
+    return len(values) > 0 and bool(values.str.fullmatch(HEX_ID_PATTERN).all())
+
+
+def _hex_to_bytes(series):
+    """Store 32-char hex IDs as 16-byte fixed-width binary, or leave them as is without pyarrow."""
+    try:
+        import pyarrow as pa
+    except ImportError:
+        return series
+    values = pa.array([None if pd.isna(value) else bytes.fromhex(value) for value in series], type=pa.binary(16))
+    return pd.Series(pd.arrays.ArrowExtensionArray(values), index=series.index, name=series.name)
+
+
+def _downcast_float(series):
+    """Downcast to float32 only when every value survives the round trip."""
+    downcast = series.astype(np.float32)
+    if np.array_equal(downcast.to_numpy(np.float64), series.to_numpy(), equal_nan=True):
+        return downcast
+    return series
+
+
+def compact_series(series, category_max_ratio=CATEGORY_MAX_RATIO):
+    """
+    Return a series stored in the smallest dtype that keeps its values.
+
+    Parameters
+    ----------
+    series : pd.Series
+        The column to compact.
+    category_max_ratio : float
+        String columns with at most this share of distinct values become
+        categoricals.
+
+    Returns
+    -------
+    pd.Series
+        The compacted column: integers downcast, floats downcast when
+        lossless, 32-char hex IDs stored as 16 bytes, repetitive strings as
+        categoricals. Any other column is returned unchanged.
+    """
+    if pd.api.types.is_bool_dtype(series):
+        return series
+    if pd.api.types.is_integer_dtype(series):
+        # signed only: `ages.min() - 1` and the like must not wrap around
+        return pd.to_numeric(series, downcast='integer')
+    if pd.api.types.is_float_dtype(series):
+        return _downcast_float(series)
+    if series.dtype == object:
+        values = series.dropna()
+        if not values.map(type).eq(str).all():
+            return series
+        if _is_hex_id(values):
+            return _hex_to_bytes(series)
+        if values.nunique() <= category_max_ratio * max(len(values), 1):
+            return series.astype('category')
+    return series
+
+
+def compact_frame(df, category_max_ratio=CATEGORY_MAX_RATIO):
+    """
+    Return a frame with every column, and an integer index, in a compact dtype.
+
+    See `compact_series` for the conversions; geometry and datetime
+    columns are left unchanged.
+    """
+    columns = {column: compact_series(df[column], category_max_ratio) for column in df.columns}
+    compacted = df.assign(**columns) if len(columns) else df
+    if pd.api.types.is_integer_dtype(compacted.index) and not isinstance(compacted.index, pd.RangeIndex):
+        compacted.index = pd.Index(compact_series(compacted.index.to_series()), name=compacted.index.name)
+    return compacted
+
+
+def memory_report(before, after):
+    """
+    Compare the memory used per column by a frame before and after compaction.
+
+    Parameters
+    ----------
+    before, after : pd.DataFrame
+        The frame as loaded and as compacted.
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per column, and the index, with dtypes, bytes and the share saved.
+    """
+    before_bytes = before.memory_usage(deep=True)
+    after_bytes = after.memory_usage(deep=True)
+    report = pd.DataFrame({
+        'before_dtype': before.dtypes.astype(str),
+        'after_dtype': after.dtypes.astype(str),
+        'before_bytes': before_bytes,
+        'after_bytes': after_bytes,
+    })
+    report.loc['Index', ['before_dtype', 'after_dtype']] = str(before.index.dtype), str(after.index.dtype)
+    report['saved'] = 1 - report['after_bytes'] / report['before_bytes']
+    return report
+
+
+def compact_dataset(name, df):
+    """
+    Compact a freshly loaded dataset when the compact-load mode is on.
+
+    Enabled with the `COMPACT_DTYPES` environment variable. The before /
+    after memory is printed and kept in `MEMORY_REPORTS` under `name`.
+
+    Parameters
+    ----------
+    name : str
+        Name of the dataset in the registry.
+    df : pd.DataFrame
+        The loaded dataset.
+
+    Returns
+    -------
+    pd.DataFrame
+        The compacted dataset, or `df` itself when the mode is off.
+    """
+    if not COMPACT_DTYPES:
+        return df
+    compacted = compact_frame(df)
+    report = memory_report(df, compacted)
+    MEMORY_REPORTS[name] = report
+    print(_summary(name, report))
+    return compacted
+
+
+def _summary(name, report):
+    before, after = report['before_bytes'].sum(), report['after_bytes'].sum()
+    return f'{name}: {before / 2**20:,.2f} MB -> {after / 2**20:,.2f} MB ({1 - after / before:.0%} saved)'
+
+
+if __name__ == '__main__':
+    for csv_file in sys.argv[1:]:
+        df = pd.read_csv(csv_file)
+        report = memory_report(df, compact_frame(df))
+        print(_summary(csv_file, report))
+        print(report.to_string(formatters={'saved': '{:.0%}'.format}))
+        print()
@@ -0,0 +1,166 @@
+import hashlib
+import os
+import threading
+from pathlib import Path
+
+import pandas as pd
+
+CACHE_DIR = Path('.cache/datasets')
+
+
+def dataset_version(file_path):
+    """
+    Return a token identifying the current version of a source file.
+
+    Parameters
+    ----------
+    file_path : str
+        Path of the source file.
+
+    Returns
+    -------
+    tuple
+        The file modification time in nanoseconds and its size in bytes.
+    """
+    stat = os.stat(file_path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def cache_path(source_file, suffix, cache_dir=CACHE_DIR, tag='', **options):
+    """
+    Build the cache file path for the current version of a source file.
+
+    The name embeds a digest of the source path, mtime, size and the read
+    options, so any change to the source produces a new cache file.
+
+    Parameters
+    ----------
+    source_file : str
+        Path of the source file.
+    suffix : str
+        Extension of the cache file.
+    cache_dir : Path
+        Directory holding the cache files.
+    tag : str
+        Appended to the file stem to tell apart several artifacts built
+        from the same source.
+    **options
+        Build options the artifact depends on.
+
+    Returns
+    -------
+    Path
+        The cache file path.
+    """
+    stat = os.stat(source_file)
+    token = f'{os.path.abspath(source_file)}|{stat.st_mtime_ns}|{stat.st_size}|{sorted(options.items())}'
+    digest = hashlib.sha1(token.encode()).hexdigest()[:16]
+    return Path(cache_dir) / f'{Path(source_file).stem}{tag}-{digest}{suffix}'
+
+
+def _replace_stale(cache_file):
+    """Remove cache files left behind by earlier versions of the same source."""
+    stem = cache_file.name.rsplit('-', 1)[0]
+    for stale in cache_file.parent.glob(f'{stem}-*{cache_file.suffix}'):
+        if stale != cache_file and stale.name.rsplit('-', 1)[0] == stem:
+            stale.unlink(missing_ok=True)
+
+
+def write_atomic(cache_file, write):
+    """
+    Write a cache file through a temporary file, then drop its stale versions.
+
+    Parameters
+    ----------
+    cache_file : Path
+        Path returned by `cache_path`.
+    write : callable
+        Called with the temporary path to write to.
+    """
+    cache_file.parent.mkdir(parents=True, exist_ok=True)
+    # unique per thread too: several sessions of one process may write the same artifact at once
+    tmp_file = cache_file.with_name(f'{cache_file.name}.{os.getpid()}.{threading.get_ident()}.tmp')
+    write(tmp_file)
+    os.replace(tmp_file, cache_file)
+    _replace_stale(cache_file)
+
+
+def read_csv_cached(csv_file, columns=None, index_col=None, **read_csv_kwargs):
+    """
+    Read a CSV file through a typed, memory-mapped Arrow IPC (Feather) cache.
+
+    The first read parses the CSV and writes an uncompressed Feather copy;
+    later reads memory-map that copy and only materialize the requested
+    columns. The cache is invalidated whenever the source mtime or size
+    changes. Falls back to `pd.read_csv` when pyarrow is not installed.
+
+    Parameters
+    ----------
+    csv_file : str
+        Path of the source CSV file.
+    columns : list of str, optional
+        Columns to load. All columns are loaded when omitted.
+    index_col : str, optional
+        Column to use as the index of the returned frame.
+    **read_csv_kwargs
+        Extra options passed to `pd.read_csv` when the cache is built.
+
+    Returns
+    -------
+    pd.DataFrame
+        The requested columns of the CSV file.
+    """
+    if columns is not None and index_col is not None and index_col not in columns:
+        columns = [index_col, *columns]
+
+    try:
+        from pyarrow import feather
+    except ImportError:
+        df = pd.read_csv(csv_file, usecols=columns, **read_csv_kwargs)
+        return df.set_index(index_col) if index_col is not None else df
+
+    cache_file = cache_path(csv_file, '.feather', **read_csv_kwargs)
+    if not cache_file.exists():
+        df = pd.read_csv(csv_file, **read_csv_kwargs)
+        write_atomic(
+            cache_file,
+            lambda path: feather.write_feather(df, path, compression='uncompressed'),
+        )
+
+    table = feather.read_table(cache_file, columns=columns, memory_map=True)
+    df = table.to_pandas()
+    return df.set_index(index_col) if index_col is not None else df
+
+
+def read_geo_cached(shp_file, columns=None):
+    """
+    Read a shapefile through a GeoParquet cache.
+
+    Parameters
+    ----------
+    shp_file : str
+        Path of the source shapefile.
+    columns : list of str, optional
+        Attribute columns to load. The geometry column is always loaded.
+
+    Returns
+    -------
+    gpd.GeoDataFrame
+        The requested columns of the shapefile.
+    """
+    import geopandas as gpd
+
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        gdf = gpd.read_file(shp_file)
+        return gdf if columns is None else gdf[[*columns, gdf.geometry.name]]
+
+    cache_file = cache_path(shp_file, '.parquet')
+    if not cache_file.exists():
+        gdf = gpd.read_file(shp_file)
+        write_atomic(cache_file, gdf.to_parquet)
+
+    if columns is not None:
+        columns = [*columns, 'geometry']
+    return gpd.read_parquet(cache_file, columns=columns)
@@ -0,0 +1,183 @@
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+import streamlit as st
+
+from utils.compact import MEMORY_REPORTS
+from utils.dataset_cache import dataset_version
+
+DATASET_BUDGET_MB = int(os.environ.get('DATASET_BUDGET_MB', 1024))
+
+
+def memory_bytes(value, _seen=None):
+    """
+    Estimate the memory held by a cached value.
+
+    Pandas objects report their deep memory usage, numpy arrays their
+    buffer size; containers and plain objects are walked recursively.
+    """
+    seen = _seen if _seen is not None else set()
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, (pd.Series, pd.Index)):
+        return int(value.memory_usage(deep=True))
+    if hasattr(value, 'nbytes') and hasattr(value, 'dtype'):
+        return int(value.nbytes)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(memory_bytes(item, seen) for item in value.values())
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return sys.getsizeof(value) + sum(memory_bytes(item, seen) for item in value)
+    if hasattr(value, '__dict__'):
+        return sys.getsizeof(value) + memory_bytes(vars(value), seen)
+    return sys.getsizeof(value)
+
+
+def _shallow_copy(value):
+    """Return a new pandas object over the same data, so column changes do not reach the cached one."""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return value.copy(deep=False)
+    return value
+
+
+class DatasetRegistry:
+    """
+    Process-wide store of loaded datasets with a memory budget.
+
+    Every page loads its data through `get`. Entries are shared by all
+    sessions; pandas objects are handed out as shallow copies, so adding
+    or replacing a column stays private to the caller, but the values
+    themselves are shared and must not be edited in place (under pandas
+    copy-on-write, the default from pandas 3.0, such edits are private
+    too). An entry is reloaded when any of its source files changes, and
+    the least recently used entries are evicted once the total exceeds
+    the budget.
+
+    Parameters
+    ----------
+    budget_mb : int
+        Memory budget in megabytes.
+    """
+
+    def __init__(self, budget_mb=DATASET_BUDGET_MB):
+        self.budget_bytes = budget_mb * 2**20
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._hits = {}
+        self._misses = {}
+        # guards the dicts and the LRU order only; loads run under a per-name lock
+        self._lock = threading.RLock()
+        self._load_locks = {}
+
+    def get(self, name, loader, *sources):
+        """
+        Return a dataset, loading it on first use or after its sources changed.
+
+        Parameters
+        ----------
+        name : str
+            Unique name of the dataset, including any load option.
+        loader : callable
+            Called without arguments to load the dataset.
+        *sources : str
+            Paths of the files the dataset is built from.
+
+        Returns
+        -------
+        object
+            The dataset; a shallow copy of the shared one for pandas objects.
+        """
+        version = tuple(dataset_version(source) for source in sources)
+        value = self._lookup(name, version)
+        if value is not None:
+            return _shallow_copy(value)
+
+        with self._lock:
+            load_lock = self._load_locks.setdefault(name, threading.RLock())
+        # one load per name at a time; other datasets stay readable meanwhile
+        with load_lock:
+            value = self._lookup(name, version)
+            if value is not None:
+                return _shallow_copy(value)
+            with self._lock:
+                self._misses[name] = self._misses.get(name, 0) + 1
+            value = loader()
+            size = memory_bytes(value)
+            with self._lock:
+                self._entries[name] = {'version': version, 'value': value, 'bytes': size}
+                self._entries.move_to_end(name)
+                self._evict(keep=name)
+            return _shallow_copy(value)
+
+    def _lookup(self, name, version):
+        """Return the cached value of `name` at `version` and count a hit, or None."""
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None or entry['version'] != version:
+                return None
+            self._entries.move_to_end(name)
+            self._hits[name] = self._hits.get(name, 0) + 1
+            return entry['value']
+
+    def _evict(self, keep):
+        while self.total_bytes() > self.budget_bytes and len(self._entries) > 1:
+            oldest = next(iter(self._entries))
+            if oldest == keep:
+                break
+            del self._entries[oldest]
+            self.evictions += 1
+
+    def total_bytes(self):
+        """Return the memory held by all cached datasets."""
+        return sum(entry['bytes'] for entry in self._entries.values())
+
+    def stats(self):
+        """
+        Return the size and hit rate of every cached dataset.
+
+        Returns
+        -------
+        list of dict
+            One row per dataset, least recently used first.
+        """
+        with self._lock:
+            rows = []
+            for name, entry in self._entries.items():
+                hits, misses = self._hits.get(name, 0), self._misses.get(name, 0)
+                rows.append({
+                    'name': name,
+                    'size_mb': entry['bytes'] / 2**20,
+                    'hits': hits,
+                    'misses': misses,
+                    'hit_rate': hits / (hits + misses) if hits + misses else 0.0,
+                })
+            return rows
+
+
+@st.cache_resource(show_spinner=False)
+def dataset_registry():
+    """Return the process-wide dataset registry."""
+    return DatasetRegistry()
+
+
+def load_dataset(name, loader, *sources):
+    """Load a dataset through the process-wide registry, see `DatasetRegistry.get`."""
+    return dataset_registry().get(name, loader, *sources)
+
+
+def show_dataset_stats():
+    """Show the registry's cached datasets, sizes and hit rates in the sidebar."""
+    registry = dataset_registry()
+    with st.sidebar.expander('Dataset cache'):
+        st.caption(f'{registry.total_bytes() / 2**20:,.1f} MB of {registry.budget_bytes / 2**20:,.0f} MB, '
+                   f'{registry.evictions} evictions')
+        st.dataframe(pd.DataFrame(registry.stats()), hide_index=True)
+        for name, report in MEMORY_REPORTS.items():
+            before, after = report['before_bytes'].sum(), report['after_bytes'].sum()
+            st.caption(f'{name}: compacted from {before / 2**20:,.2f} MB to {after / 2**20:,.2f} MB')
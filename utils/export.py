@@ -0,0 +1,97 @@
+import hashlib
+import os
+import threading
+from pathlib import Path
+
+import pandas as pd
+
+CSV_CHUNK_ROWS = 100_000
+EXPORT_DIR = Path('.cache/exports')
+EXPORT_MAX_FILES = 16
+EXPORT_SUFFIXES = {'CSV': '.csv', 'Excel': '.xlsx'}
+
+
+def iter_csv_chunks(df, chunk_rows=CSV_CHUNK_ROWS):
+    """
+    Serialize a frame to CSV in row chunks.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        The rows to export.
+    chunk_rows : int
+        Number of rows serialized per chunk.
+
+    Yields
+    ------
+    bytes
+        UTF-8 encoded CSV text, the header included in the first chunk.
+    """
+    if df.empty:
+        yield df.to_csv(index=False).encode()
+        return
+    for start in range(0, len(df), chunk_rows):
+        chunk = df.iloc[start:start + chunk_rows]
+        yield chunk.to_csv(index=False, header=start == 0).encode()
+
+
+def write_csv(df, path):
+    """Write a frame to a CSV file chunk by chunk."""
+    with open(path, 'wb') as f:
+        for chunk in iter_csv_chunks(df):
+            f.write(chunk)
+
+
+def write_excel(df, path, sheet_name):
+    """Write a frame to an Excel workbook file."""
+    with pd.ExcelWriter(path, engine='openpyxl') as writer:
+        df.to_excel(writer, index=False, sheet_name=sheet_name)
+
+
+def _prune_exports(keep):
+    # finished exports only: temporary files still being written are left alone
+    files = [path for suffix in EXPORT_SUFFIXES.values() for path in EXPORT_DIR.glob(f'*{suffix}')]
+    files.sort(key=lambda path: path.stat().st_mtime_ns if path.exists() else 0)
+    for stale in files[:-EXPORT_MAX_FILES]:
+        if stale != keep:
+            stale.unlink(missing_ok=True)
+
+
+def build_export(df, export_key, file_format, sheet_name='Sheet1'):
+    """
+    Serialize a frame to a file for download, reused by export key and format.
+
+    The file is written to disk chunk by chunk instead of being assembled
+    in memory, and only the latest `EXPORT_MAX_FILES` exports are kept.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        The rows to export.
+    export_key : tuple
+        Dataset version and normalized filter selection of `df`.
+    file_format : str
+        Either "CSV" or "Excel".
+    sheet_name : str
+        Worksheet name used for Excel exports.
+
+    Returns
+    -------
+    Path
+        The export file.
+    """
+    digest = hashlib.sha1(repr((export_key, file_format, sheet_name)).encode()).hexdigest()[:16]
+    path = EXPORT_DIR / f'{digest}{EXPORT_SUFFIXES[file_format]}'
+    if path.exists():
+        os.utime(path)
+        return path
+
+    EXPORT_DIR.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f'{path.name}.{os.getpid()}.{threading.get_ident()}.tmp')
+    if file_format == 'Excel':
+        write_excel(df, tmp_path, sheet_name)
+    else:
+        write_csv(df, tmp_path)
+    os.replace(tmp_path, path)
+    _prune_exports(keep=path)
+    return path
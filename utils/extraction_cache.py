@@ -0,0 +1,110 @@
+import hashlib
+import os
+import threading
+from pathlib import Path
+
+import streamlit as st
+
+EXTRACTION_CACHE_DIR = Path('.cache/extractions')
+EXTRACTION_CACHE_MB = int(os.environ.get('EXTRACTION_CACHE_MB', 64))
+
+
+def image_digest(image_bytes):
+    """Return the sha256 hex digest of an image's bytes."""
+    return hashlib.sha256(image_bytes).hexdigest()
+
+
+def extraction_key(image_bytes, model_name, prompt):
+    """
+    Return the content address of an extraction.
+
+    Parameters
+    ----------
+    image_bytes : bytes
+        The image sent to the model.
+    model_name : str
+        Name of the model.
+    prompt : str
+        The prompt sent with the image.
+
+    Returns
+    -------
+    str
+        The sha256 hex digest of the image, model name and prompt.
+    """
+    digest = hashlib.sha256()
+    for part in (image_digest(image_bytes).encode(), model_name.encode(), prompt.encode()):
+        digest.update(len(part).to_bytes(8, 'big'))
+        digest.update(part)
+    return digest.hexdigest()
+
+
+class ExtractionCache:
+    """
+    Disk-bounded, content-addressed store of extracted texts.
+
+    Each text is a file named after its `extraction_key`. Reads refresh the
+    file's modification time, and once the directory exceeds its budget the
+    least recently used files are deleted. The files are shared by every
+    session and survive restarts.
+
+    Parameters
+    ----------
+    directory : Path
+        Directory holding the cached texts.
+    max_mb : int
+        Disk budget in megabytes.
+    """
+
+    def __init__(self, directory=EXTRACTION_CACHE_DIR, max_mb=EXTRACTION_CACHE_MB):
+        self.directory = Path(directory)
+        self.max_bytes = max_mb * 2**20
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def _path(self, key):
+        return self.directory / key[:2] / f'{key}.txt'
+
+    def get(self, key):
+        """Return the cached text of an extraction, or None."""
+        path = self._path(key)
+        try:
+            text = path.read_text(encoding='utf-8')
+            os.utime(path)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return text
+
+    def put(self, key, text):
+        """Store the text of an extraction, then evict down to the budget."""
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f'{path.name}.{os.getpid()}.{threading.get_ident()}.tmp')
+        tmp_path.write_text(text, encoding='utf-8')
+        os.replace(tmp_path, path)
+        self._evict()
+
+    def _evict(self):
+        with self._lock:
+            entries = []
+            for path in self.directory.glob('*/*.txt'):
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime_ns, stat.st_size, path))
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                path.unlink(missing_ok=True)
+                total -= size
+
+
+@st.cache_resource(show_spinner=False)
+def load_extraction_cache():
+    """Return the process-wide extraction cache."""
+    return ExtractionCache()
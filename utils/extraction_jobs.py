@@ -0,0 +1,135 @@
+import threading
+import time
+
+import streamlit as st
+
+JOB_TTL_SECONDS = 15 * 60
+
+
+class ExtractionJob:
+    """
+    Streamed text extraction running in a background thread.
+
+    The chunks produced so far are kept on the job, so any number of
+    readers, including a rerun of the page that started it, can replay them
+    and then follow the rest live.
+
+    Parameters
+    ----------
+    engine : OcrEngine
+        The backend whose `stream` produces the text.
+    image_bytes : bytes
+        The encoded image.
+    on_done : callable, optional
+        Called with the full text once the extraction succeeded.
+    """
+
+    def __init__(self, engine, image_bytes, on_done=None):
+        self.chunks = []
+        self.error = None
+        self.done = False
+        self.started = time.perf_counter()
+        self.first_text_at = None
+        self.finished_at = None
+        self._changed = threading.Condition()
+        self._thread = threading.Thread(target=self._run, args=(engine, image_bytes, on_done), daemon=True)
+        self._thread.start()
+
+    def _run(self, engine, image_bytes, on_done):
+        try:
+            for chunk in engine.stream(image_bytes):
+                with self._changed:
+                    if self.first_text_at is None:
+                        self.first_text_at = time.perf_counter()
+                    self.chunks.append(chunk)
+                    self._changed.notify_all()
+        except Exception as e:
+            self.error = e
+        with self._changed:
+            self.done = True
+            self.finished_at = time.perf_counter()
+            self._changed.notify_all()
+        if self.error is None and on_done is not None:
+            on_done(self.text)
+
+    @property
+    def text(self):
+        """Return the text extracted so far."""
+        return ''.join(self.chunks)
+
+    @property
+    def time_to_first_text(self):
+        """Return the seconds from start to the first chunk, or None."""
+        return None if self.first_text_at is None else self.first_text_at - self.started
+
+    def stream(self):
+        """
+        Yield every chunk, replaying the stored ones first.
+
+        Yields
+        ------
+        str
+            The chunks in order; the generator ends with the job.
+        """
+        position = 0
+        while True:
+            with self._changed:
+                while position == len(self.chunks) and not self.done:
+                    self._changed.wait()
+                chunks = self.chunks[position:]
+                done = self.done
+            yield from chunks
+            position += len(chunks)
+            if done and position == len(self.chunks):
+                return
+
+
+class JobRegistry:
+    """
+    Process-wide extraction jobs, keyed by extraction key.
+
+    Starting a job whose key is already running returns the running job, so
+    a rerun reattaches to it instead of restarting the extraction. Finished
+    jobs are dropped after `ttl` seconds.
+
+    Parameters
+    ----------
+    ttl : float
+        Seconds a finished job is kept.
+    """
+
+    def __init__(self, ttl=JOB_TTL_SECONDS):
+        self.ttl = ttl
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def start(self, key, engine, image_bytes, on_done=None):
+        """
+        Return the job for `key`, starting it unless it is running or kept.
+
+        Failed jobs are restarted.
+
+        Returns
+        -------
+        ExtractionJob
+            The running or finished job.
+        """
+        with self._lock:
+            self._expire()
+            job = self._jobs.get(key)
+            if job is None or (job.done and job.error is not None):
+                job = ExtractionJob(engine, image_bytes, on_done)
+                self._jobs[key] = job
+            return job
+
+    def _expire(self):
+        now = time.perf_counter()
+        for key, job in list(self._jobs.items()):
+            if job.done and now - job.finished_at > self.ttl:
+                del self._jobs[key]
+
+
+@st.cache_resource(show_spinner=False)
+def load_job_registry():
+    """Return the process-wide extraction job registry."""
+    return JobRegistry()
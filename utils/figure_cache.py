@@ -0,0 +1,74 @@
+import threading
+from collections import OrderedDict
+
+import streamlit as st
+
+FIGURE_CACHE_ENTRIES = 128
+
+
+class FigureCache:
+    """
+    Bounded LRU cache of built Plotly figures, shared by every session.
+
+    Figures are keyed by (chart id, normalized filter selection, dataset
+    version), so switching sections or going back to an earlier filter
+    combination reuses the figure instead of rebuilding it. Cached figures
+    are shared and must not be modified after they are built.
+
+    Parameters
+    ----------
+    max_entries : int
+        Number of figures kept before the least recently used is evicted.
+    """
+
+    def __init__(self, max_entries=FIGURE_CACHE_ENTRIES):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._figures = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_build(self, chart_id, filter_key, version, build, *args):
+        """
+        Return the cached figure for a key, building it on a miss.
+
+        Parameters
+        ----------
+        chart_id : hashable
+            Identifies the chart and any chart-specific option.
+        filter_key : tuple
+            Normalized filter selection, see `selection_key`.
+        version : hashable
+            Version of the dataset the figure is built from.
+        build : callable
+            Called with `*args` to build the figure on a miss.
+
+        Returns
+        -------
+        plotly.graph_objects.Figure
+            The cached or newly built figure.
+        """
+        key = (chart_id, filter_key, version)
+        with self._lock:
+            if key in self._figures:
+                self._figures.move_to_end(key)
+                self.hits += 1
+                return self._figures[key]
+            self.misses += 1
+
+        figure = build(*args)
+        with self._lock:
+            self._figures[key] = figure
+            self._figures.move_to_end(key)
+            while len(self._figures) > self.max_entries:
+                self._figures.popitem(last=False)
+        return figure
+
+    def __len__(self):
+        return len(self._figures)
+
+
+@st.cache_resource(show_spinner=False)
+def load_figure_cache(max_entries=FIGURE_CACHE_ENTRIES):
+    """Return the process-wide figure cache."""
+    return FigureCache(max_entries)
@@ -0,0 +1,118 @@
+import numpy as np
+import pandas as pd
+
+
+def selection_key(selections, ranges=None):
+    """
+    Normalize a filter selection into a hashable, order-independent key.
+
+    Parameters
+    ----------
+    selections : dict
+        Mapping of column name to the list of selected values.
+    ranges : dict, optional
+        Mapping of column name to an active (low, high) range.
+
+    Returns
+    -------
+    tuple
+        Sorted (column, values) pairs, with empty selections dropped,
+        followed by the sorted ranges.
+    """
+    key = tuple(
+        (column, tuple(sorted(str(value) for value in values)))
+        for column, values in sorted(selections.items())
+        if values
+    )
+    if ranges:
+        key += tuple((column, (low, high)) for column, (low, high) in sorted(ranges.items()))
+    return key
+
+
+def take_rows(df, rows):
+    """Return the rows of `df` selected by a boolean mask or row positions, or all of them for None."""
+    if rows is None:
+        # a new frame over the same data, so callers never hold the shared one
+        return df.copy(deep=False)
+    if rows.dtype == bool:
+        rows = np.flatnonzero(rows)
+    return df.take(rows)
+
+
+class FilterIndex:
+    """
+    Per-value bitmask index over the categorical filter columns of a frame.
+
+    Each column is integer-coded once and one boolean mask is kept per
+    distinct value, so any selection resolves to a row mask with a handful
+    of vectorized OR / AND operations and a single gather.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        The frame to index.
+    columns : list of str
+        The columns exposed as multiselect filters.
+    """
+
+    def __init__(self, df, columns):
+        self.n_rows = len(df)
+        self._values = {}
+        self._masks = {}
+        for column in columns:
+            codes, uniques = pd.factorize(df[column], sort=True)
+            values = list(uniques)
+            self._values[column] = values
+            self._masks[column] = {value: codes == code for code, value in enumerate(values)}
+
+    def values(self, column):
+        """Return the distinct values of an indexed column, in sorted order."""
+        return self._values[column]
+
+    def mask(self, selections):
+        """
+        Resolve a selection to a row mask.
+
+        Parameters
+        ----------
+        selections : dict
+            Mapping of column name to the list of selected values. Empty
+            selections leave the column unfiltered.
+
+        Returns
+        -------
+        np.ndarray or None
+            Boolean row mask, or None when nothing is filtered.
+        """
+        row_mask = None
+        for column, selected in selections.items():
+            if not selected:
+                continue
+            masks = self._masks[column]
+            column_mask = np.zeros(self.n_rows, dtype=bool)
+            for value in selected:
+                if value in masks:
+                    column_mask |= masks[value]
+            if row_mask is None:
+                row_mask = column_mask
+            else:
+                row_mask &= column_mask
+        return row_mask
+
+    def apply(self, df, selections):
+        """
+        Return the rows of `df` matching a selection.
+
+        Parameters
+        ----------
+        df : pd.DataFrame
+            The indexed frame.
+        selections : dict
+            Mapping of column name to the list of selected values.
+
+        Returns
+        -------
+        pd.DataFrame
+            The matching rows, or `df` itself when nothing is filtered.
+        """
+        return take_rows(df, self.mask(selections))
@@ -0,0 +1,158 @@
+"""
+Multi-resolution geometry for the choropleth maps.
+
+Polygons are simplified as a coverage, so borders shared by two regions are
+simplified once and stay shared; no gaps or overlaps open up between
+neighbours. Each level of detail is keyed by its tolerance in CRS units
+(degrees for the Kenya shapefiles).
+
+Run ``python -m utils.geometry <shapefile>`` at build time to write the
+GeoJSON artifact of every level and print its vertex count and size.
+"""
+import sys
+import warnings
+from pathlib import Path
+
+import numpy as np
+import shapely
+
+from utils.dataset_cache import cache_path, write_atomic
+
+# 0.0 keeps the full-resolution geometry
+LOD_TOLERANCES = (0.0, 0.0005, 0.002, 0.008, 0.03)
+# simplify by at most half a rendered pixel
+PIXEL_TOLERANCE_RATIO = 0.5
+ARTIFACT_DIR = Path('.cache/geometry')
+
+
+def simplify_coverage(geometries, tolerance, quantize=True):
+    """
+    Simplify a polygon coverage without separating shared borders.
+
+    Uses `shapely.coverage_simplify` (shapely >= 2.1). Older shapely
+    versions cannot simplify a coverage without opening slivers along
+    shared borders, so they get the full-resolution polygons and a warning.
+
+    Parameters
+    ----------
+    geometries : array-like of shapely geometries
+        The polygons of the coverage.
+    tolerance : float
+        Simplification tolerance in CRS units. 0 returns the input.
+    quantize : bool
+        Snap vertices to a grid of a quarter of the tolerance; shared
+        vertices snap identically, so borders stay shared.
+
+    Returns
+    -------
+    np.ndarray of shapely geometries
+        The simplified polygons, in input order.
+    """
+    geometries = np.asarray(geometries)
+    if tolerance <= 0:
+        return geometries
+    if not hasattr(shapely, 'coverage_simplify'):
+        warnings.warn(f'shapely {shapely.__version__} has no coverage_simplify (needs >= 2.1); '
+                      'keeping the full-resolution geometry.', RuntimeWarning, stacklevel=2)
+        return geometries
+    simplified = shapely.coverage_simplify(geometries, tolerance)
+    if quantize:
+        simplified = shapely.set_precision(simplified, tolerance / 4)
+    return simplified
+
+
+def build_lod_levels(gdf, tolerances=LOD_TOLERANCES, quantize=True):
+    """
+    Build one simplified copy of a GeoDataFrame per tolerance.
+
+    Parameters
+    ----------
+    gdf : gpd.GeoDataFrame
+        The full-resolution regions.
+    tolerances : iterable of float
+        The tolerances to build.
+    quantize : bool
+        Snap simplified vertices to a grid, see `simplify_coverage`.
+
+    Returns
+    -------
+    dict
+        Tolerance mapped to a GeoDataFrame with the same index as `gdf`.
+    """
+    levels = {}
+    for tolerance in tolerances:
+        level = gdf.copy()
+        level.geometry = simplify_coverage(gdf.geometry.values, tolerance, quantize=quantize)
+        levels[tolerance] = level
+    return levels
+
+
+def pick_level(bounds, width, height, tolerances=LOD_TOLERANCES):
+    """
+    Pick the coarsest level of detail that stays below pixel resolution.
+
+    Parameters
+    ----------
+    bounds : tuple of float
+        (minx, miny, maxx, maxy) of the area shown.
+    width, height : int
+        Rendered map size in pixels.
+    tolerances : iterable of float
+        The available tolerances.
+
+    Returns
+    -------
+    float
+        The selected tolerance.
+    """
+    minx, miny, maxx, maxy = bounds
+    units_per_pixel = max((maxx - minx) / width, (maxy - miny) / height)
+    budget = units_per_pixel * PIXEL_TOLERANCE_RATIO
+    return max((tolerance for tolerance in tolerances if tolerance <= budget), default=min(tolerances))
+
+
+def vertex_count(gdf):
+    """Return the number of coordinates in a GeoDataFrame."""
+    return int(shapely.get_num_coordinates(gdf.geometry.values).sum())
+
+
+def geojson_artifact(shp_file, tolerance, level=None):
+    """
+    Return the GeoJSON file of one level of detail, writing it if needed.
+
+    The file holds only the geometries, with feature ids taken from the
+    GeoDataFrame index, and is written once per shapefile version.
+
+    Parameters
+    ----------
+    shp_file : str
+        Path of the source shapefile.
+    tolerance : float
+        The level of detail.
+    level : gpd.GeoDataFrame, optional
+        The simplified regions, built from `shp_file` when omitted.
+
+    Returns
+    -------
+    Path
+        Path of the GeoJSON file.
+    """
+    artifact = cache_path(shp_file, '.geojson', cache_dir=ARTIFACT_DIR, tag=f'-lod{tolerance:g}')
+    if not artifact.exists():
+        if level is None:
+            import geopandas as gpd
+
+            level = build_lod_levels(gpd.read_file(shp_file), tolerances=[tolerance])[tolerance]
+        geojson = level[[level.geometry.name]].to_json()
+        write_atomic(artifact, lambda path: Path(path).write_text(geojson))
+    return artifact
+
+
+if __name__ == '__main__':
+    import geopandas as gpd
+
+    for shp_file in sys.argv[1:]:
+        for tolerance, level in build_lod_levels(gpd.read_file(shp_file)).items():
+            artifact = geojson_artifact(shp_file, tolerance, level)
+            print(f'{shp_file} tolerance={tolerance:<7} vertices={vertex_count(level):>9,} '
+                  f'geojson={artifact.stat().st_size / 1024:>9,.0f}KB')
@@ -0,0 +1,77 @@
+import pandas as pd
+
+SUM_COLUMNS = ['Total Amount', 'Quantity', 'Revenue Per Unit', 'Transactions']
+
+
+def derive_kpis(sums):
+    """
+    Turn summed cell values into KPIs, row by row.
+
+    Parameters
+    ----------
+    sums : pd.DataFrame
+        Rows of summed `SUM_COLUMNS`, e.g. one per period.
+
+    Returns
+    -------
+    pd.DataFrame
+        The KPIs of each row.
+    """
+    transactions = sums['Transactions'].where(sums['Transactions'] > 0)
+    return pd.DataFrame({
+        'Total Sales': sums['Total Amount'],
+        'Total Quantity Sold': sums['Quantity'],
+        'Number of Transactions': sums['Transactions'].astype(int),
+        'Average Sales': sums['Total Amount'] / transactions,
+        'Avg Revenue Per Unit': sums['Revenue Per Unit'] / transactions,
+    }, index=sums.index)
+
+
+def period_kpis(cells, period='Month', current=None):
+    """
+    Compute the KPIs of a selection overall, per period, and for a period
+    against the one before it.
+
+    All metrics come from one group-by over the pre-aggregated cells; the
+    overall and comparison figures are sums of the per-period rows.
+
+    Parameters
+    ----------
+    cells : pd.DataFrame
+        Aggregated cells with a `period` column and `SUM_COLUMNS`.
+    period : str
+        The column holding the period label.
+    current : str, optional
+        The period to report deltas for. Defaults to the latest one.
+
+    Returns
+    -------
+    dict
+        `totals` (dict of overall KPIs, including "Average Monthly
+        Sales"), `by_period` (pd.DataFrame of per-period KPIs), `current`
+        and `previous` period labels, and `deltas` (pd.Series of current
+        minus previous, empty when there is no earlier period).
+    """
+    sums = cells.groupby(period)[SUM_COLUMNS].sum().sort_index()
+    by_period = derive_kpis(sums)
+    # column by column, so that the transaction count stays an integer
+    totals = {name: values.iloc[0] for name, values in derive_kpis(sums.sum().to_frame().T).items()}
+    totals['Average Monthly Sales'] = totals['Total Sales'] / len(sums) if len(sums) else 0.0
+
+    periods = list(sums.index)
+    if current not in periods:
+        current = periods[-1] if periods else None
+    position = periods.index(current) if current is not None else 0
+    previous = periods[position - 1] if position > 0 else None
+    if previous is None:
+        deltas = pd.Series(dtype=float)
+    else:
+        deltas = by_period.loc[current] - by_period.loc[previous]
+
+    return {
+        'totals': totals,
+        'by_period': by_period,
+        'current': current,
+        'previous': previous,
+        'deltas': deltas,
+    }
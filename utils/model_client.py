@@ -0,0 +1,380 @@
+import argparse
+import os
+import random
+import threading
+import time
+from bisect import bisect_left
+from concurrent.futures import ThreadPoolExecutor
+
+import streamlit as st
+
+MODEL_TIMEOUT_S = float(os.environ.get('MODEL_TIMEOUT_S', 60))
+MODEL_MAX_RETRIES = int(os.environ.get('MODEL_MAX_RETRIES', 3))
+LATENCY_BUCKETS_MS = (50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000)
+# google.api_core / requests exception names worth retrying; matched by name so nothing is imported here
+TRANSIENT_ERRORS = {
+    'DeadlineExceeded', 'InternalServerError', 'ResourceExhausted', 'ServiceUnavailable', 'TooManyRequests',
+    'ConnectionError', 'TimeoutError', 'ReadTimeout', 'ConnectTimeout',
+}
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling the model while the circuit breaker is open."""
+
+
+class LatencyHistogram:
+    """
+    Thread-safe latency histogram over fixed millisecond buckets.
+
+    Parameters
+    ----------
+    buckets_ms : tuple of float
+        Upper bounds of the buckets; slower calls land in an overflow bucket.
+    """
+
+    def __init__(self, buckets_ms=LATENCY_BUCKETS_MS):
+        self.buckets_ms = buckets_ms
+        self.counts = [0] * (len(buckets_ms) + 1)
+        self.total_ms = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, ms):
+        with self._lock:
+            self.counts[bisect_left(self.buckets_ms, ms)] += 1
+            self.total_ms += ms
+
+    def quantile(self, q):
+        """Return the upper bound of the bucket holding the `q` quantile, or None."""
+        with self._lock:
+            total = sum(self.counts)
+            if not total:
+                return None
+            seen = 0
+            for bound, count in zip((*self.buckets_ms, float('inf')), self.counts):
+                seen += count
+                if seen >= q * total:
+                    return bound
+
+    def snapshot(self):
+        """Return the bucket counts keyed by their "<= bound ms" label."""
+        labels = [f'<= {bound:,} ms' for bound in self.buckets_ms] + [f'> {self.buckets_ms[-1]:,} ms']
+        with self._lock:
+            return dict(zip(labels, self.counts))
+
+
+class CircuitBreaker:
+    """
+    Stop calling a failing backend for a while.
+
+    After `failure_threshold` consecutive failures the circuit opens and
+    calls fail fast for `reset_timeout` seconds; then a single trial call is
+    let through, which closes the circuit again on success.
+
+    Parameters
+    ----------
+    failure_threshold : int
+        Consecutive failures that open the circuit.
+    reset_timeout : float
+        Seconds the circuit stays open.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._trial = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return 'closed'
+        return 'half-open' if time.monotonic() - self.opened_at >= self.reset_timeout else 'open'
+
+    def before_call(self):
+        """Raise `CircuitOpenError` unless a call may go through."""
+        with self._lock:
+            state = self.state
+            if state == 'open' or (state == 'half-open' and self._trial):
+                raise CircuitOpenError('The model is unavailable, retry in a few seconds.')
+            self._trial = state == 'half-open'
+
+    def record(self, success):
+        with self._lock:
+            self._trial = False
+            if success:
+                self.failures = 0
+                self.opened_at = None
+            else:
+                self.failures += 1
+                if self.failures >= self.failure_threshold:
+                    self.opened_at = time.monotonic()
+
+
+class GeminiBackend:
+    """
+    Google Gemini backend: configures the client and builds the model once.
+
+    Parameters
+    ----------
+    model_name : str
+        Name of the Gemini model.
+    api_key : str
+        Gemini API key.
+    """
+
+    def __init__(self, model_name, api_key):
+        import google.generativeai as genai
+
+        genai.configure(api_key=api_key)
+        self.model_name = model_name
+        self.model = genai.GenerativeModel(model_name=model_name)
+
+    def generate_content(self, contents, stream=False, timeout=None):
+        return self.model.generate_content(contents, stream=stream, request_options={'timeout': timeout})
+
+
+class _FakeChunk:
+    def __init__(self, text):
+        self.text = text
+
+
+class _FakeResponse:
+    def __init__(self, text, chunk_words):
+        self.text = text
+        self._chunk_words = chunk_words
+
+    def __iter__(self):
+        words = self.text.split(' ')
+        for start in range(0, len(words), self._chunk_words):
+            yield _FakeChunk(' '.join(words[start:start + self._chunk_words]) + ' ')
+
+
+class FakeBackend:
+    """
+    Local stand-in for the remote model, for offline and load testing.
+
+    Parameters
+    ----------
+    model_name : str
+        Name reported as the model name.
+    latency_s : float
+        Mean simulated latency; each call sleeps between half and 1.5 times it.
+    failure_rate : float
+        Share of calls raising a transient `ConnectionError`.
+    text : str
+        The text returned for every call.
+    """
+
+    def __init__(self, model_name='fake', latency_s=0.2, failure_rate=0.0, text='Fake extracted text.'):
+        self.model_name = model_name
+        self.latency_s = latency_s
+        self.failure_rate = failure_rate
+        self.text = text
+
+    def generate_content(self, contents, stream=False, timeout=None):
+        latency = self.latency_s * random.uniform(0.5, 1.5)
+        if timeout is not None and latency > timeout:
+            time.sleep(timeout)
+            raise TimeoutError(f'Fake model call exceeded {timeout} s')
+        time.sleep(latency)
+        if random.random() < self.failure_rate:
+            raise ConnectionError('Simulated transient failure')
+        return _FakeResponse(self.text, chunk_words=4)
+
+
+class ModelClient:
+    """
+    Shared client around a model backend with timeouts, retries and a circuit breaker.
+
+    Exposes the `model_name` / `generate_content` interface of
+    `genai.GenerativeModel`, so it is a drop-in replacement for the model.
+    Transient errors are retried with exponential backoff and jitter and
+    count toward the circuit breaker; every call's latency is recorded.
+
+    Parameters
+    ----------
+    backend : GeminiBackend or FakeBackend
+        The backend making the calls.
+    timeout : float
+        Per-call timeout in seconds.
+    max_retries : int
+        Retries after a transient error.
+    base_delay : float
+        Backoff before the first retry, doubled on each following one.
+    breaker : CircuitBreaker, optional
+        The circuit breaker; a default one is created when omitted.
+    """
+
+    def __init__(self, backend, timeout=MODEL_TIMEOUT_S, max_retries=MODEL_MAX_RETRIES, base_delay=0.5, breaker=None):
+        self.backend = backend
+        self.model_name = backend.model_name
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.breaker = breaker or CircuitBreaker()
+        self.latency = LatencyHistogram()
+        self.calls = 0
+        self.retries = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+
+    def generate_content(self, contents, stream=False):
+        """
+        Call the model, retrying transient errors.
+
+        Parameters
+        ----------
+        contents : list
+            The prompt parts, e.g. an image and a text.
+        stream : bool
+            Return an iterable of chunks instead of the full response. The
+            iteration is covered too: a transient error before the first
+            chunk restarts the call, and errors while reading the chunks
+            count toward the circuit breaker. A stalled stream is bounded by
+            the backend's per-call timeout.
+
+        Returns
+        -------
+        object
+            The backend response with a `text` attribute, or an iterable of
+            chunks with a `text` attribute each when streaming.
+        """
+        if stream:
+            return self._stream(contents)
+        return self._call(contents)
+
+    def _failed(self, e, retry):
+        """Count a failed call; return True when it should be retried."""
+        transient = type(e).__name__ in TRANSIENT_ERRORS
+        # only transient errors say anything about the backend's health; a bad
+        # request from one user must not open the breaker for everybody
+        self.breaker.record(success=not transient)
+        with self._lock:
+            self.calls += 1
+            self.errors += 1
+            if transient and retry:
+                self.retries += 1
+        return transient and retry
+
+    def _backoff(self, attempt):
+        time.sleep(self.base_delay * 2 ** attempt * random.uniform(0.5, 1.5))
+
+    def _call(self, contents):
+        for attempt in range(self.max_retries + 1):
+            self.breaker.before_call()
+            start = time.perf_counter()
+            try:
+                response = self.backend.generate_content(contents, stream=False, timeout=self.timeout)
+            except Exception as e:
+                if not self._failed(e, retry=attempt < self.max_retries):
+                    raise
+                self._backoff(attempt)
+                continue
+            self._succeeded(start)
+            return response
+
+    def _stream(self, contents):
+        for attempt in range(self.max_retries + 1):
+            self.breaker.before_call()
+            start = time.perf_counter()
+            started = False
+            try:
+                for chunk in self.backend.generate_content(contents, stream=True, timeout=self.timeout):
+                    started = True
+                    yield chunk
+            except GeneratorExit:
+                # the reader stopped early while the backend was answering
+                self.breaker.record(success=True)
+                raise
+            except Exception as e:
+                # chunks already shown cannot be taken back, so only a stream
+                # that failed before its first chunk is restarted
+                if not self._failed(e, retry=attempt < self.max_retries and not started):
+                    raise
+                self._backoff(attempt)
+                continue
+            self._succeeded(start)
+            return
+
+    def _succeeded(self, start):
+        self.latency.record((time.perf_counter() - start) * 1000)
+        self.breaker.record(success=True)
+        with self._lock:
+            self.calls += 1
+
+    def stats(self):
+        """Return the call, retry and error counts, breaker state and latency quantiles."""
+        return {
+            'backend': type(self.backend).__name__,
+            'calls': self.calls,
+            'retries': self.retries,
+            'errors': self.errors,
+            'circuit': self.breaker.state,
+            'p50_ms': self.latency.quantile(0.5),
+            'p95_ms': self.latency.quantile(0.95),
+        }
+
+
+def model_backend():
+    """Return the configured backend, "gemini" or "fake", from MODEL_BACKEND in the environment or secrets."""
+    return os.environ.get('MODEL_BACKEND') or st.secrets.get('MODEL_BACKEND', 'gemini')
+
+
+@st.cache_resource(show_spinner=False)
+def load_model_client(model_name, backend='gemini'):
+    """
+    Return the process-wide model client, created once per model and backend.
+
+    Parameters
+    ----------
+    model_name : str
+        Name of the model.
+    backend : str
+        "gemini" for the Google API, "fake" for the local stand-in.
+
+    Returns
+    -------
+    ModelClient
+        The shared client.
+    """
+    if backend == 'fake':
+        # a distinct name keeps fake texts out of the real model's extraction cache entries
+        return ModelClient(FakeBackend(f'fake:{model_name}'))
+    return ModelClient(GeminiBackend(model_name, api_key=st.secrets["GEMINI_API_KEY"]))
+
+
+def show_client_stats(client):
+    """Show the model client's counters and latency histogram in the sidebar."""
+    with st.sidebar.expander('Model client'):
+        st.json(client.stats())
+        st.bar_chart(client.latency.snapshot())
+
+
+def _try(client):
+    try:
+        client.generate_content(['load test'])
+        return True
+    except Exception:
+        return False
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Load-test the model client against the fake backend.')
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--latency', type=float, default=0.2)
+    parser.add_argument('--failure-rate', type=float, default=0.05)
+    args = parser.parse_args()
+
+    client = ModelClient(FakeBackend(latency_s=args.latency, failure_rate=args.failure_rate), base_delay=0.05)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        outcomes = list(pool.map(lambda _: _try(client), range(args.requests)))
+    elapsed = time.perf_counter() - start
+    print(f'{args.requests} requests in {elapsed:,.2f} s ({args.requests / elapsed:,.1f}/s), '
+          f'{outcomes.count(False)} failed')
+    print(client.stats())
+    for label, count in client.latency.snapshot().items():
+        print(f'{label:>14} {count:>6}')
@@ -0,0 +1,285 @@
+import abc
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from io import BytesIO
+
+# kept free of streamlit: the Tesseract workers re-import this module in fresh processes
+
+DEFAULT_PROMPT = "Extract text from the image:"
+GEMINI_REQUESTS_PER_MINUTE = int(os.environ.get('GEMINI_REQUESTS_PER_MINUTE', 15))
+BAND_HEIGHT = 400
+BLANK_ROW_LEVEL = 200
+
+
+class RateLimiter:
+    """
+    Thread-safe token bucket allowing `rate` calls per `period` seconds.
+
+    Parameters
+    ----------
+    rate : int
+        Calls allowed per period, also the burst size.
+    period : float
+        Length of the period in seconds.
+    """
+
+    def __init__(self, rate, period=60.0):
+        self.rate = rate
+        self.period = period
+        self._tokens = float(rate)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a call is allowed."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.rate, self._tokens + (now - self._updated) * self.rate / self.period)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) * self.period / self.rate
+            time.sleep(wait)
+
+
+class OcrEngine(abc.ABC):
+    """
+    Interface of the text extraction backends.
+
+    Subclasses must implement `extract` and may override `executor` / `submit`
+    to run somewhere other than a thread pool; `cache_name` identifies the
+    engine and its settings in the extraction cache.
+    """
+
+    cache_name = ''
+
+    @abc.abstractmethod
+    def extract(self, image_bytes):
+        """Return the text of one encoded image."""
+
+    def stream(self, image_bytes):
+        """Yield the text of one encoded image in pieces, as soon as each is ready."""
+        yield self.extract(image_bytes)
+
+    def executor(self, max_workers):
+        """Return the pool the batch items run in."""
+        return ThreadPoolExecutor(max_workers=max_workers)
+
+    def submit(self, pool, image_bytes):
+        """Schedule the extraction of one image on a pool from `executor`."""
+        return pool.submit(self.extract, image_bytes)
+
+
+def _tesseract_text(image_bytes, lang):
+    import tesserocr
+    from PIL import Image
+
+    return tesserocr.image_to_text(Image.open(BytesIO(image_bytes)), lang=lang)
+
+
+def band_boxes(image, band_height=BAND_HEIGHT):
+    """
+    Split an image into horizontal bands, cutting on blank rows where possible.
+
+    Each cut is moved down to the first row brighter than `BLANK_ROW_LEVEL`
+    within half a band, so that lines of text are not split.
+
+    Parameters
+    ----------
+    image : PIL.Image.Image
+        The page image.
+    band_height : int
+        Target height of a band in pixels.
+
+    Returns
+    -------
+    list of tuple
+        (left, upper, right, lower) crop boxes, top to bottom.
+    """
+    import numpy as np
+
+    width, height = image.size
+    blank_rows = np.asarray(image.convert('L')).min(axis=1) > BLANK_ROW_LEVEL
+    boxes, upper = [], 0
+    while upper < height:
+        lower = min(upper + band_height, height)
+        if lower < height:
+            window = blank_rows[lower:min(lower + band_height // 2, height)]
+            if window.any():
+                lower += int(np.argmax(window))
+        boxes.append((0, upper, width, lower))
+        upper = lower
+    return boxes
+
+
+class TesseractEngine(OcrEngine):
+    """
+    Local Tesseract OCR; batches run in a process pool across all cores.
+
+    Parameters
+    ----------
+    lang : str
+        Tesseract language code(s), e.g. "eng" or "eng+swa".
+    """
+
+    def __init__(self, lang='eng'):
+        self.lang = lang
+        self.cache_name = f'tesseract:{lang}'
+
+    def extract(self, image_bytes):
+        return _tesseract_text(image_bytes, self.lang)
+
+    def executor(self, max_workers):
+        # spawned, not forked: the Streamlit server process is multi-threaded
+        return ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context('spawn'))
+
+    def submit(self, pool, image_bytes):
+        return pool.submit(_tesseract_text, image_bytes, self.lang)
+
+    def stream(self, image_bytes):
+        """Yield the text of the image band by band, top to bottom."""
+        import tesserocr
+        from PIL import Image
+
+        image = Image.open(BytesIO(image_bytes))
+        with tesserocr.PyTessBaseAPI(lang=self.lang) as api:
+            for box in band_boxes(image):
+                api.SetImage(image.crop(box))
+                text = api.GetUTF8Text()
+                if text.strip():
+                    yield text
+
+
+class GeminiEngine(OcrEngine):
+    """
+    Google Gemini text extraction, rate limited across the worker threads.
+
+    Parameters
+    ----------
+    model : google.generativeai.GenerativeModel
+        The loaded model.
+    prompt : str
+        The prompt sent with every image.
+    limiter : RateLimiter, optional
+        Shared limiter; defaults to `GEMINI_REQUESTS_PER_MINUTE`.
+    """
+
+    def __init__(self, model, prompt=DEFAULT_PROMPT, limiter=None):
+        self.model = model
+        self.prompt = prompt
+        self.limiter = limiter or RateLimiter(GEMINI_REQUESTS_PER_MINUTE)
+        self.cache_name = model.model_name
+
+    def extract(self, image_bytes):
+        from PIL import Image
+
+        self.limiter.acquire()
+        response = self.model.generate_content([Image.open(BytesIO(image_bytes)), '\n\n', self.prompt])
+        return response.text
+
+    def stream(self, image_bytes):
+        """Yield the response chunks as the model streams them."""
+        from PIL import Image
+
+        self.limiter.acquire()
+        response = self.model.generate_content([Image.open(BytesIO(image_bytes)), '\n\n', self.prompt], stream=True)
+        for chunk in response:
+            yield chunk.text
+
+
+class StubEngine(OcrEngine):
+    """
+    Local stand-in model that returns a fixed text after scripted delays.
+
+    Used to measure time-to-first-text without a remote model.
+
+    Parameters
+    ----------
+    text : str
+        The text returned for every image.
+    first_delay : float
+        Seconds before the first chunk, i.e. the model's time to first token.
+    chunk_delay : float
+        Seconds between the following chunks.
+    chunk_words : int
+        Words per streamed chunk.
+    """
+
+    def __init__(self, text='Lorem ipsum dolor sit amet. ' * 200, first_delay=0.5, chunk_delay=0.05, chunk_words=8):
+        self.text = text
+        self.first_delay = first_delay
+        self.chunk_delay = chunk_delay
+        self.chunk_words = chunk_words
+        self.cache_name = f'stub:{first_delay}:{chunk_delay}'
+
+    def stream(self, image_bytes):
+        words = self.text.split(' ')
+        time.sleep(self.first_delay)
+        for start in range(0, len(words), self.chunk_words):
+            if start:
+                time.sleep(self.chunk_delay)
+            yield ' '.join(words[start:start + self.chunk_words]) + ' '
+
+    def extract(self, image_bytes):
+        return ''.join(self.stream(image_bytes))
+
+
+def run_batch(engine, images, max_workers, cache=None, prompt=DEFAULT_PROMPT):
+    """
+    Extract the text of many images on a bounded pool, yielding results as they finish.
+
+    Parameters
+    ----------
+    engine : OcrEngine
+        The backend to run.
+    images : list of bytes
+        The encoded images.
+    max_workers : int
+        Size of the worker pool.
+    cache : ExtractionCache, optional
+        Cache consulted before, and filled after, each extraction.
+    prompt : str
+        Prompt part of the cache key.
+
+    Yields
+    ------
+    tuple of (int, str or None, Exception or None)
+        Position of the image in `images`, its text and the error raised
+        while extracting it. Closing the generator cancels the images not
+        started yet.
+    """
+    from utils.extraction_cache import extraction_key
+
+    pending = []
+    for position, image_bytes in enumerate(images):
+        key = extraction_key(image_bytes, engine.cache_name, prompt)
+        text = cache.get(key) if cache is not None else None
+        if text is not None:
+            yield position, text, None
+        else:
+            pending.append((position, key, image_bytes))
+    if not pending:
+        return
+
+    with engine.executor(max_workers) as pool:
+        futures = {engine.submit(pool, image_bytes): (position, key) for position, key, image_bytes in pending}
+        try:
+            for future in as_completed(futures):
+                position, key = futures[future]
+                try:
+                    text = future.result()
+                except Exception as e:
+                    yield position, None, e
+                    continue
+                if cache is not None:
+                    cache.put(key, text)
+                yield position, text, None
+        except GeneratorExit:
+            # the reader went away, e.g. on a page rerun: only the running images are waited for
+            pool.shutdown(wait=False, cancel_futures=True)
+            raise
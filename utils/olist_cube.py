@@ -0,0 +1,160 @@
+import sys
+
+from utils.dataset_cache import cache_path, dataset_version, write_atomic
+from utils.dataset_registry import load_dataset
+from utils.olist_db import CACHE_DIR, olist_connection, olist_sources, olist_version
+
+ALL = 'All'
+QUANTILES = (0.25, 0.5, 0.75, 0.9)
+PRODUCT_MEASURES = [
+    'product_weight_g', 'product_length_cm', 'product_height_cm', 'product_width_cm', 'product_photos_qty',
+]
+ITEM_MEASURES = ['price', 'freight_value', 'product_weight_g']
+CATEGORY_EXPR = "COALESCE(t.product_category_name_english, p.product_category_name, 'unknown')"
+
+
+def _stats(value):
+    quantiles = ', '.join(f'quantile_cont({value}, {q}) AS p{round(q * 100)}' for q in QUANTILES)
+    return f'COUNT({value}) AS count, SUM({value}) AS sum, MIN({value}) AS min, MAX({value}) AS max, {quantiles}'
+
+
+def _level(column, label):
+    return f"CASE WHEN GROUPING({column}) = 1 THEN '{ALL}' ELSE {column} END AS {label}"
+
+
+def _measures(columns, prefix):
+    return ', '.join(f'{prefix}.{column}::DOUBLE AS {column}' for column in columns)
+
+
+PRODUCT_CUBE_SQL = f"""
+    SELECT {_level('product_category', 'category')}, measure, {_stats('value')}
+    FROM (
+        SELECT {CATEGORY_EXPR} AS product_category, {_measures(PRODUCT_MEASURES, 'p')}
+        FROM products p
+        LEFT JOIN category_translation t USING (product_category_name)
+    )
+    UNPIVOT (value FOR measure IN ({', '.join(PRODUCT_MEASURES)}))
+    GROUP BY GROUPING SETS ((product_category, measure), (measure))
+"""
+
+SELLER_CUBE_SQL = f"""
+    SELECT {_level('seller_state', 'state')}, {_level('seller_city', 'city')},
+           COUNT(*) AS sellers, COUNT(DISTINCT seller_zip_code_prefix) AS zip_codes
+    FROM sellers
+    GROUP BY GROUPING SETS ((seller_state, seller_city), (seller_state), ())
+"""
+
+CATEGORY_STATE_CUBE_SQL = f"""
+    SELECT {_level('product_category', 'category')}, {_level('seller_state', 'state')}, measure, {_stats('value')}
+    FROM (
+        SELECT {CATEGORY_EXPR} AS product_category, s.seller_state,
+               i.price::DOUBLE AS price, i.freight_value::DOUBLE AS freight_value,
+               p.product_weight_g::DOUBLE AS product_weight_g
+        FROM order_items i
+        JOIN products p USING (product_id)
+        JOIN sellers s USING (seller_id)
+        LEFT JOIN category_translation t USING (product_category_name)
+    )
+    UNPIVOT (value FOR measure IN ({', '.join(ITEM_MEASURES)}))
+    GROUP BY GROUPING SETS (
+        (product_category, seller_state, measure), (product_category, measure), (seller_state, measure), (measure)
+    )
+"""
+
+# cube name -> (tables it is built from, query); rows rolled up over a key carry `ALL` in it
+CUBES = {
+    'products': (('products', 'category_translation'), PRODUCT_CUBE_SQL),
+    'sellers': (('sellers',), SELLER_CUBE_SQL),
+    'category_state': (('order_items', 'products', 'sellers', 'category_translation'), CATEGORY_STATE_CUBE_SQL),
+}
+
+
+def cube_sources(name):
+    """Return the source CSV paths of a cube, or None when one of its tables is missing."""
+    tables, _ = CUBES[name]
+    sources = olist_sources()
+    if not all(table in sources for table in tables):
+        return None
+    return [sources[table] for table in tables]
+
+
+def available_cubes():
+    """Return the names of the cubes whose source tables are all present."""
+    return [name for name in CUBES if cube_sources(name) is not None]
+
+
+def cube_file(name):
+    """
+    Return the Parquet path of a cube for the current version of its sources.
+
+    The name embeds the version of every source table and the cube query,
+    so a cube is rebuilt only when one of its own inputs changes.
+    """
+    first, *others = cube_sources(name)
+    return cache_path(
+        first, '.parquet', cache_dir=CACHE_DIR, tag=f'.{name}_cube',
+        sources=[(source, dataset_version(source)) for source in others], sql=CUBES[name][1],
+    )
+
+
+def build_cube(name):
+    """
+    Build a cube unless it is already persisted for the current sources.
+
+    Parameters
+    ----------
+    name : str
+        Key of `CUBES`.
+
+    Returns
+    -------
+    Path
+        The Parquet file holding the cube.
+    """
+    cube = cube_file(name)
+    if not cube.exists():
+        cursor = olist_connection(olist_version()).cursor()
+        try:
+            write_atomic(cube, lambda path: cursor.execute(f"COPY ({CUBES[name][1]}) TO '{path}' (FORMAT PARQUET)"))
+        finally:
+            cursor.close()
+    return cube
+
+
+def _read_cube(name):
+    cursor = olist_connection(olist_version()).cursor()
+    try:
+        return cursor.execute('SELECT * FROM read_parquet(?)', [str(build_cube(name))]).df()
+    finally:
+        cursor.close()
+
+
+def load_cube(name):
+    """
+    Return a precomputed group-by cube of the Olist tables.
+
+    Each cube holds count, sum, min, max and quantiles at every level of
+    its grouping keys, rolled-up levels being labelled `ALL`, so drill-down
+    charts only select rows. Cubes are persisted next to the Parquet copies
+    of the tables and rebuilt when one of their own source files changes.
+
+    Parameters
+    ----------
+    name : str
+        Key of `CUBES`.
+
+    Returns
+    -------
+    pd.DataFrame or None
+        The cube, or None when one of its source tables is missing.
+    """
+    sources = cube_sources(name)
+    if sources is None:
+        return None
+    return load_dataset(f'olist_cube:{name}', lambda: _read_cube(name), *sources)
+
+
+if __name__ == '__main__':
+    for name in sys.argv[1:] or available_cubes():
+        cube = build_cube(name)
+        print(f'{name:<16} {cube} {cube.stat().st_size / 1024:>9,.0f}KB')
@@ -0,0 +1,108 @@
+import os
+from pathlib import Path
+
+import streamlit as st
+
+from utils.dataset_cache import cache_path, dataset_version, write_atomic
+
+OLIST_DIR = os.environ.get('OLIST_DIR', 'datasets/olist_ecommerce_database')
+CACHE_DIR = Path('.cache/olist')
+
+# table name -> (CSV file, read_csv options); tables whose file is missing are skipped,
+# so the order / item tables are picked up as soon as they are added
+OLIST_TABLES = {
+    'products': ('olist_products_dataset.csv', ''),
+    'sellers': ('olist_sellers_dataset.csv', ", types={'seller_zip_code_prefix': 'VARCHAR'}"),
+    'category_translation': (
+        'product_category_name_translation.csv',
+        ", columns={'product_category_name': 'VARCHAR', 'product_category_name_english': 'VARCHAR'}",
+    ),
+    'orders': ('olist_orders_dataset.csv', ''),
+    'order_items': ('olist_order_items_dataset.csv', ''),
+}
+
+
+def olist_sources():
+    """Return the CSV path of every Olist table present on disk."""
+    sources = {}
+    for table, (file_name, _) in OLIST_TABLES.items():
+        path = os.path.join(OLIST_DIR, file_name)
+        if os.path.exists(path):
+            sources[table] = path
+    return sources
+
+
+def olist_version():
+    """Return a token that changes whenever any Olist source file changes."""
+    return tuple(sorted((table, dataset_version(path)) for table, path in olist_sources().items()))
+
+
+def _parquet_copy(connection, table, csv_file):
+    """Convert a source CSV to Parquet once per source version and return its path."""
+    options = OLIST_TABLES[table][1]
+    parquet_file = cache_path(csv_file, '.parquet', cache_dir=CACHE_DIR, options=options)
+    if not parquet_file.exists():
+        write_atomic(parquet_file, lambda path: connection.execute(
+            f"COPY (SELECT * FROM read_csv('{csv_file}', header=true, auto_detect=true{options})) "
+            f"TO '{path}' (FORMAT PARQUET)"
+        ))
+    return parquet_file
+
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def olist_connection(version):
+    """
+    Open an in-process DuckDB database with one view per Olist table.
+
+    Each view reads a Parquet copy of its CSV, so queries scan only the
+    columns they use.
+
+    Parameters
+    ----------
+    version : tuple
+        Value of `olist_version()`; a new connection is opened when it changes.
+
+    Returns
+    -------
+    duckdb.DuckDBPyConnection
+        The shared connection. Use `cursor()` per query, connections are not
+        safe to share between threads.
+    """
+    import duckdb
+
+    connection = duckdb.connect()
+    for table, csv_file in olist_sources().items():
+        parquet_file = _parquet_copy(connection, table, csv_file)
+        connection.execute(f"CREATE VIEW {table} AS SELECT * FROM read_parquet('{parquet_file}')")
+    return connection
+
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def _run_query(sql, params, version):
+    cursor = olist_connection(version).cursor()
+    try:
+        return cursor.execute(sql, list(params)).df()
+    finally:
+        cursor.close()
+
+
+def run_query(sql, params=()):
+    """
+    Run a SQL query against the Olist tables, cached by text and parameters.
+
+    Results are shared across sessions and refreshed when a source file
+    changes.
+
+    Parameters
+    ----------
+    sql : str
+        The query, with `$1`, `$2`, ... placeholders.
+    params : tuple
+        Values bound to the placeholders.
+
+    Returns
+    -------
+    pd.DataFrame
+        The query result.
+    """
+    return _run_query(sql, tuple(params), olist_version())
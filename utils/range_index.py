@@ -0,0 +1,108 @@
+import numpy as np
+
+
+class SortedColumn:
+    """
+    Sorted index over one numeric column, for [low, high] range lookups.
+
+    The column is argsorted once; any range then resolves with two binary
+    searches to a contiguous slice of row positions.
+
+    Parameters
+    ----------
+    values : array-like
+        The column values, in row order.
+    """
+
+    def __init__(self, values):
+        values = np.asarray(values)
+        self.order = np.argsort(values, kind='stable')
+        self.sorted_values = values[self.order]
+
+    @property
+    def min(self):
+        return self.sorted_values[0] if len(self.sorted_values) else None
+
+    @property
+    def max(self):
+        return self.sorted_values[-1] if len(self.sorted_values) else None
+
+    def positions(self, low, high):
+        """
+        Return the positions of the rows with `low <= value <= high`.
+
+        Returns
+        -------
+        np.ndarray
+            A slice of the sort order: row positions in ascending value order.
+        """
+        start = np.searchsorted(self.sorted_values, low, side='left')
+        stop = np.searchsorted(self.sorted_values, high, side='right')
+        return self.order[start:stop]
+
+    def covers(self, low, high):
+        """Return True when the range keeps every row."""
+        return len(self.sorted_values) == 0 or (low <= self.min and high >= self.max)
+
+
+class RangeFilterIndex:
+    """
+    Sorted indexes over the numeric columns exposed as range sliders.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        The frame to index.
+    columns : list of str
+        The numeric columns to index.
+    """
+
+    def __init__(self, df, columns):
+        self.n_rows = len(df)
+        self.columns = {column: SortedColumn(df[column]) for column in columns}
+
+    def bounds(self, column):
+        """Return the (min, max) of a column."""
+        return self.columns[column].min, self.columns[column].max
+
+    def active(self, ranges):
+        """Return the ranges that actually exclude rows."""
+        return {
+            column: (low, high)
+            for column, (low, high) in ranges.items()
+            if not self.columns[column].covers(low, high)
+        }
+
+    def rows(self, ranges, base=None):
+        """
+        Resolve ranges to the selected rows, combined with an optional base mask.
+
+        Only the matching positions are touched: each range is a slice of
+        its sort order, several ranges are intersected as position arrays,
+        and a base mask is looked up at those positions.
+
+        Parameters
+        ----------
+        ranges : dict
+            Mapping of column name to a (low, high) tuple, bounds included.
+        base : np.ndarray, optional
+            Boolean row mask to AND with, e.g. from `FilterIndex.mask`.
+
+        Returns
+        -------
+        np.ndarray or None
+            Ascending row positions, or `base` itself when no range
+            excludes rows.
+        """
+        positions = None
+        for column, (low, high) in self.active(ranges).items():
+            column_positions = self.columns[column].positions(low, high)
+            if positions is None:
+                positions = np.sort(column_positions)
+            else:
+                positions = np.intersect1d(positions, column_positions, assume_unique=True)
+        if positions is None:
+            return base
+        if base is not None:
+            positions = positions[base[positions]]
+        return positions
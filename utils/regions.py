@@ -0,0 +1,117 @@
+import numpy as np
+import shapely
+
+SUM_COLUMNS = ['Total', 'Male', 'Female', 'Intersex', 'PERIMETER', 'AREA']
+
+
+def _column_sums(frame):
+    # summed column by column so integer counts keep their dtype
+    return {column: frame[column].sum() for column in frame.columns}
+
+
+class RegionEngine:
+    """
+    Spatial index and pre-aggregated roll-ups over a hierarchy of admin regions.
+
+    The finest regions (e.g. wards) are indexed with an STRtree for point
+    and bounding-box lookups; their additive columns are summed once per
+    level of the hierarchy (e.g. ward -> constituency -> county) and
+    nationally, so metrics for any selection are computed from a handful of
+    pre-summed rows instead of the raw geometries.
+
+    Parameters
+    ----------
+    gdf : gpd.GeoDataFrame
+        One row per finest region.
+    id_column : str
+        Column naming the finest regions.
+    parent_columns : list of str
+        Columns naming the enclosing regions, from finest to coarsest.
+    sum_columns : list of str
+        Additive columns to roll up.
+    """
+
+    def __init__(self, gdf, id_column, parent_columns=(), sum_columns=SUM_COLUMNS):
+        self.id_column = id_column
+        self.levels = [id_column, *parent_columns]
+        self._ids = gdf[id_column].to_numpy()
+        self._tree = shapely.STRtree(gdf.geometry.values)
+        self._rollups = {
+            level: gdf.groupby(level, sort=True)[sum_columns].sum()
+            for level in self.levels
+        }
+        self.national = _column_sums(gdf[sum_columns])
+
+    def regions(self, level=None):
+        """Return the names of the regions of a level, sorted."""
+        return self._rollups[level or self.id_column].index.tolist()
+
+    def rollup(self, level=None):
+        """Return the pre-summed columns of every region of a level."""
+        return self._rollups[level or self.id_column]
+
+    def locate(self, x, y):
+        """
+        Return the finest regions containing each point.
+
+        Parameters
+        ----------
+        x, y : float or array-like of float
+            Point coordinates, in the CRS of the regions.
+
+        Returns
+        -------
+        np.ndarray
+            Region name per point, None where no region contains it.
+        """
+        points = shapely.points(np.atleast_1d(x), np.atleast_1d(y))
+        point_positions, region_positions = self._tree.query(points, predicate='intersects')
+        names = np.full(len(points), None, dtype=object)
+        names[point_positions] = self._ids[region_positions]
+        return names
+
+    def in_bbox(self, minx, miny, maxx, maxy):
+        """Return the finest regions intersecting a bounding box (e.g. the viewport)."""
+        positions = self._tree.query(shapely.box(minx, miny, maxx, maxy), predicate='intersects')
+        return self._ids[np.sort(positions)].tolist()
+
+    def summary(self, selected=None, level=None):
+        """
+        Compute population and area metrics for a selection of regions.
+
+        Parameters
+        ----------
+        selected : list of str, optional
+            Region names at `level`. The whole country when empty.
+        level : str, optional
+            The level `selected` refers to. Defaults to the finest level.
+
+        Returns
+        -------
+        dict
+            Totals of the summed columns, population density, sex ratios and
+            the mean / median region area.
+        """
+        rollup = self.rollup(level)
+        rows = rollup.loc[rollup.index.intersection(selected)] if selected else rollup
+        totals = _column_sums(rows) if selected else self.national
+        return {
+            'total_population': totals['Total'],
+            'total_male': totals['Male'],
+            'total_female': totals['Female'],
+            'total_intersex': totals['Intersex'],
+            'total_perimeter': totals['PERIMETER'],
+            'total_area': totals['AREA'],
+            'mean_population_density': totals['Total'] / totals['AREA'] if totals['AREA'] else 0.0,
+            'ratio_of_male_to_female': totals['Male'] / totals['Female'] if totals['Female'] else 0.0,
+            'ratio_of_female_to_male': totals['Female'] / totals['Male'] if totals['Male'] else 0.0,
+            'mean_area': rows['AREA'].mean() if len(rows) else 0.0,
+            'median_area': rows['AREA'].median() if len(rows) else 0.0,
+        }
+
+
+def parent_columns(gdf, id_column, hierarchy=('Ward', 'Constituency', 'County')):
+    """Return the levels of `hierarchy` above `id_column` that `gdf` has columns for."""
+    levels = list(hierarchy)
+    above = levels[levels.index(id_column) + 1:] if id_column in levels else []
+    return [level for level in above if level in gdf.columns]
@@ -0,0 +1,134 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from utils.compact import compact_dataset
+from utils.dataset_cache import read_csv_cached
+from utils.dataset_registry import load_dataset
+from utils.filter_index import FilterIndex
+from utils.range_index import RangeFilterIndex
+from utils.time_rollup import DAY_ORDER, day_keys
+
+SALES_CSV_FILE = os.environ.get('SALES_CSV_FILE', 'datasets/retail_sales_dataset.csv')
+AGE_GROUP_BINS = 6
+FILTER_COLUMNS = ['Product Category', 'Gender', 'Age Group']
+RANGE_COLUMNS = ['Age', 'Total Amount']
+
+
+def age_group_edges(ages, no_bins=AGE_GROUP_BINS):
+    """
+    Compute the integer bin edges used for the "Age Group" column.
+
+    Parameters
+    ----------
+    ages : pd.Series
+        Customer ages.
+    no_bins : int
+        Number of age groups.
+
+    Returns
+    -------
+    tuple of (list, list)
+        The bin edges and the matching "low-high" labels.
+    """
+    bins = np.linspace(ages.min() - 1, ages.max(), no_bins + 1)
+    edges = [int(edge) for edge in bins]
+    labels = [f'{low}-{high}' for low, high in zip(edges, edges[1:])]
+    return edges, labels
+
+
+def prepare_sales_data(df):
+    """
+    Add the derived columns used by the sales dashboard.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        The raw transactions as read from the CSV file.
+
+    Returns
+    -------
+    pd.DataFrame
+        The transactions with parsed dates, integer Day Key, Month / Day of
+        Week keys, "Age Group" bins and "Revenue Per Unit".
+    """
+    df['Date'] = pd.to_datetime(df['Date'])
+    df['Day Key'] = day_keys(df['Date'])
+    df['Month'] = df['Date'].dt.to_period('M').astype(str)
+    df['Day of Week'] = pd.Categorical(df['Date'].dt.day_name(), categories=DAY_ORDER, ordered=True)
+
+    edges, labels = age_group_edges(df['Age'])
+    df['Age Group'] = pd.cut(df['Age'], bins=edges, labels=labels)
+
+    df['Revenue Per Unit'] = df['Total Amount'] / df['Quantity']
+    return df
+
+
+def load_sales_data(csv_file=SALES_CSV_FILE):
+    """
+    Load the enriched sales dataset, preparing it once per source-file version.
+
+    The prepared frame is shared by every session through the dataset
+    registry; callers get a shallow copy and must not edit its values in
+    place.
+
+    Parameters
+    ----------
+    csv_file : str
+        Path of the transactions CSV file.
+
+    Returns
+    -------
+    pd.DataFrame
+        The prepared transactions, in compact dtypes when `COMPACT_DTYPES`
+        is set.
+    """
+    name = f'sales:{csv_file}'
+    return load_dataset(
+        name,
+        lambda: compact_dataset(name, prepare_sales_data(read_csv_cached(csv_file, index_col='Transaction ID'))),
+        csv_file,
+    )
+
+
+def load_sales_filter_index(csv_file=SALES_CSV_FILE):
+    """
+    Load the sidebar filter index built over the prepared sales dataset.
+
+    Parameters
+    ----------
+    csv_file : str
+        Path of the transactions CSV file.
+
+    Returns
+    -------
+    FilterIndex
+        The index over `FILTER_COLUMNS`, built once per source-file version.
+    """
+    return load_dataset(
+        f'sales-filter-index:{csv_file}',
+        lambda: FilterIndex(load_sales_data(csv_file), FILTER_COLUMNS),
+        csv_file,
+    )
+
+
+def load_sales_range_index(csv_file=SALES_CSV_FILE):
+    """
+    Load the sorted indexes behind the sidebar range sliders.
+
+    Parameters
+    ----------
+    csv_file : str
+        Path of the transactions CSV file.
+
+    Returns
+    -------
+    RangeFilterIndex
+        The index over `RANGE_COLUMNS`, built once per source-file version.
+    """
+    return load_dataset(
+        f'sales-range-index:{csv_file}',
+        lambda: RangeFilterIndex(load_sales_data(csv_file), RANGE_COLUMNS),
+        csv_file,
+    )
@@ -0,0 +1,246 @@
+import csv
+import hashlib
+import io
+import os
+import threading
+
+import pandas as pd
+import streamlit as st
+
+from utils.sales_data import SALES_CSV_FILE, age_group_edges
+
+CELL_KEYS = ['Product Category', 'Gender', 'Age', 'Month']
+CELL_VALUES = ['Total Amount', 'Quantity', 'Revenue Per Unit', 'Transactions']
+DEFAULT_CHUNKSIZE = 250_000
+FINGERPRINT_BYTES = 64 * 1024
+
+
+class _BoundedReader(io.RawIOBase):
+    """Read-only view of a binary file that stops at a fixed byte offset."""
+
+    def __init__(self, f, end):
+        self._f = f
+        self._end = end
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        remaining = self._end - self._f.tell()
+        if remaining <= 0:
+            return 0
+        return self._f.readinto(memoryview(buffer)[:remaining])
+
+
+def _last_line_end(f, size, block_size=64 * 1024):
+    """Return the offset just past the last newline of a file, or 0."""
+    position = size
+    while position > 0:
+        start = max(0, position - block_size)
+        f.seek(start)
+        block = f.read(position - start)
+        newline = block.rfind(b'\n')
+        if newline != -1:
+            return start + newline + 1
+        position = start
+    return 0
+
+
+def aggregate_cells(rows):
+    """
+    Sum transactions into (Product Category, Gender, Age, Month) cells.
+
+    Parameters
+    ----------
+    rows : pd.DataFrame
+        Transactions with at least the raw CSV columns.
+
+    Returns
+    -------
+    pd.DataFrame
+        `CELL_VALUES` summed per cell, indexed by `CELL_KEYS`.
+    """
+    rows = rows.assign(
+        Month=pd.to_datetime(rows['Date']).dt.to_period('M').astype(str),
+        Transactions=1,
+    )
+    rows['Revenue Per Unit'] = rows['Total Amount'] / rows['Quantity']
+    return rows.groupby(CELL_KEYS, observed=True)[CELL_VALUES].sum()
+
+
+class SalesAggregator:
+    """
+    Running per-cell aggregates of a transactions CSV, built by streaming it in chunks.
+
+    Cells are keyed by (Product Category, Gender, Age, Month) and hold the
+    summed amount, quantity, revenue per unit and transaction count, so the
+    KPIs of any filter combination are a sum over a few hundred cells (see
+    `utils.kpis.period_kpis`). Rows appended to the file are folded in by
+    `refresh` without re-reading the rows already seen.
+
+    Parameters
+    ----------
+    csv_file : str
+        Path of the transactions CSV file.
+    chunksize : int
+        Number of rows parsed per chunk.
+    """
+
+    def __init__(self, csv_file, chunksize=DEFAULT_CHUNKSIZE):
+        self.csv_file = csv_file
+        self.chunksize = chunksize
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._stat = None
+        self.offset = 0
+        self.rows = 0
+        self._columns = None
+        self._fingerprint = None
+        self._cells = None
+        self._tail = None
+        self._tail_rows = 0
+        self._cells_frame = None
+
+    def _read_fingerprint(self, f):
+        f.seek(0)
+        return hashlib.sha1(f.read(min(self.offset, FINGERPRINT_BYTES))).hexdigest()
+
+    def refresh(self):
+        """
+        Fold in the rows appended since the last refresh.
+
+        The whole file is re-read when it shrank, was rewritten at the same
+        size, or its head changed; an unchanged size and mtime skip all
+        reads. A last line without a trailing newline is counted as a row,
+        but kept apart from the folded cells: it is parsed again on the next
+        refresh, in case a writer was still appending to it.
+
+        Returns
+        -------
+        SalesAggregator
+            The aggregator itself.
+        """
+        with self._lock:
+            stat = os.stat(self.csv_file)
+            # size alone misses a same-size rewrite in place, which the mtime catches
+            if (stat.st_size, stat.st_mtime_ns) == self._stat:
+                return self
+            size = stat.st_size
+            # appends always grow the file, so a new mtime at the same size is a rewrite
+            rewritten = self._stat is not None and size == self._stat[0]
+            with open(self.csv_file, 'rb') as f:
+                if rewritten or size < self.offset or self._read_fingerprint(f) != self._fingerprint:
+                    self._reset()
+                if self._columns is None:
+                    f.seek(0)
+                    header = f.readline().decode('utf-8-sig')
+                    self._columns = next(csv.reader([header]))
+                    self.offset = f.tell()
+
+                end = _last_line_end(f, size)
+                if end > self.offset:
+                    f.seek(self.offset)
+                    reader = io.BufferedReader(_BoundedReader(f, end))
+                    for chunk in pd.read_csv(reader, names=self._columns, header=None, chunksize=self.chunksize):
+                        self._fold(chunk)
+                    self.offset = end
+                    self._fingerprint = self._read_fingerprint(f)
+                self._read_tail(f, size)
+                self._stat = (size, stat.st_mtime_ns)
+            self._cells_frame = None
+        return self
+
+    def _read_tail(self, f, size):
+        """Aggregate the bytes after the last newline, which `pd.read_csv` would count as a row."""
+        self.rows -= self._tail_rows
+        self._tail, self._tail_rows = None, 0
+        f.seek(self.offset)
+        tail = f.read(size - self.offset)
+        if not tail.strip():
+            return
+        try:
+            rows = pd.read_csv(io.BytesIO(tail), names=self._columns, header=None)
+            self._tail = aggregate_cells(rows)
+        except ValueError:
+            # a row still being written may not parse yet; it is read again once it grows
+            return
+        self._tail_rows = len(rows)
+        self.rows += self._tail_rows
+
+    def _fold(self, chunk):
+        cells = aggregate_cells(chunk)
+        if self._cells is not None:
+            cells = pd.concat([self._cells, cells]).groupby(level=CELL_KEYS).sum()
+        self._cells = cells
+        self.rows += len(chunk)
+
+    def cells(self):
+        """
+        Return the aggregated cells with their "Age Group" label.
+
+        Age groups use the same bins as the in-memory dataset, derived from
+        the youngest and oldest customer seen so far.
+
+        Returns
+        -------
+        pd.DataFrame
+            One row per cell, with the key and value columns.
+        """
+        cells_frame = self._cells_frame
+        if cells_frame is None:
+            parts = [cells for cells in (self._cells, self._tail) if cells is not None]
+            if not parts:
+                cells_frame = pd.DataFrame(columns=[*CELL_KEYS, 'Age Group', *CELL_VALUES])
+            else:
+                cells = parts[0] if len(parts) == 1 else pd.concat(parts).groupby(level=CELL_KEYS).sum()
+                cells_frame = cells.reset_index()
+                edges, labels = age_group_edges(cells_frame['Age'])
+                cells_frame['Age Group'] = pd.cut(cells_frame['Age'], bins=edges, labels=labels)
+            self._cells_frame = cells_frame
+        return cells_frame
+
+    def select(self, selections):
+        """
+        Return the cells matching a sidebar selection.
+
+        Parameters
+        ----------
+        selections : dict
+            Mapping of column name to the list of selected values. Empty
+            selections leave the column unfiltered.
+
+        Returns
+        -------
+        pd.DataFrame
+            The matching cells.
+        """
+        cells = self.cells()
+        mask = pd.Series(True, index=cells.index)
+        for column, selected in selections.items():
+            if selected:
+                mask &= cells[column].isin(selected)
+        return cells[mask]
+
+
+@st.cache_resource(show_spinner=False)
+def _sales_aggregator(csv_file):
+    return SalesAggregator(csv_file)
+
+
+def load_sales_aggregator(csv_file=SALES_CSV_FILE):
+    """
+    Return the process-wide aggregator for a transactions file, brought up to date.
+
+    Parameters
+    ----------
+    csv_file : str
+        Path of the transactions CSV file.
+
+    Returns
+    -------
+    SalesAggregator
+        The shared aggregator, with any appended rows folded in.
+    """
+    return _sales_aggregator(csv_file).refresh()
@@ -0,0 +1,104 @@
+"""
+Startup profile: import time per module for the app and each page.
+
+Every script is run once, headlessly through AppTest, in a fresh
+``python -X importtime`` process. Only the imports triggered by the script
+itself are counted; Streamlit and the test harness are already loaded when
+it starts.
+
+Usage (from the repository root)::
+
+    python -m utils.startup_profile
+    python -m utils.startup_profile views/sales_dashboard.py --top 20
+"""
+import argparse
+import glob
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict
+
+MARKER = '-- startup profile: script starts --'
+SECRETS = {
+    'GEMINI_API_KEY': 'startup-profile',
+    'MODEL_NAME': 'startup-profile',
+    'WEB_HOOK_URL': 'http://localhost/startup-profile',
+}
+CHILD = f'''
+import sys
+from streamlit.testing.v1 import AppTest
+
+at = AppTest.from_file(sys.argv[1], default_timeout=600)
+for key, value in {SECRETS!r}.items():
+    at.secrets[key] = value
+sys.stderr.write({MARKER!r} + '\\n')
+sys.stderr.flush()
+at.run()
+if at.exception:
+    sys.exit(at.exception[0].message)
+'''
+IMPORT_LINE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)')
+
+
+def profile_script(script):
+    """
+    Measure the imports made while a script first renders.
+
+    Parameters
+    ----------
+    script : str
+        Path of the Streamlit script.
+
+    Returns
+    -------
+    dict
+        Top-level package mapped to the import time of its modules, in
+        microseconds.
+
+    Raises
+    ------
+    RuntimeError
+        If the script, or the profiling process itself, failed.
+    """
+    process = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', CHILD, os.path.abspath(script)],
+        capture_output=True,
+        text=True,
+    )
+    if process.returncode != 0:
+        errors = [line for line in process.stderr.splitlines() if line.strip() and not line.startswith('import time:')]
+        raise RuntimeError(f'exit code {process.returncode}: ' + ('\n'.join(errors[-5:]) or 'no error output'))
+    _, _, log = process.stderr.partition(MARKER)
+    packages = defaultdict(int)
+    for line in log.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match:
+            self_us, _, _, module = match.groups()
+            packages[module.split('.')[0]] += int(self_us)
+    return dict(packages)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('scripts', nargs='*', help='Scripts to profile. Defaults to app.py and views/*.py.')
+    parser.add_argument('--top', type=int, default=10, help='Number of packages listed per script.')
+    args = parser.parse_args(argv)
+
+    failed = False
+    for script in args.scripts or ['app.py', *sorted(glob.glob('views/*.py'))]:
+        try:
+            packages = profile_script(script)
+        except RuntimeError as e:
+            print(f'{script}: FAILED, {e}')
+            failed = True
+            continue
+        total = sum(packages.values())
+        print(f'{script}: {total / 1000:,.1f} ms of imports')
+        for package, micros in sorted(packages.items(), key=lambda item: item[1], reverse=True)[:args.top]:
+            print(f'    {package:<30} {micros / 1000:>9,.1f} ms')
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+
+DAY_ORDER = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+GRANULARITIES = {'Day': 'D', 'Week': 'W', 'Month': 'M', 'Quarter': 'Q'}
+
+
+def day_keys(dates):
+    """
+    Encode datetimes as integer day numbers since the Unix epoch.
+
+    Parameters
+    ----------
+    dates : pd.Series
+        Datetime values.
+
+    Returns
+    -------
+    np.ndarray
+        int32 day numbers.
+    """
+    return dates.to_numpy(dtype='datetime64[D]').astype(np.int32)
+
+
+class TimeRollup:
+    """
+    Daily totals of a value, from which every coarser time series is derived.
+
+    The only pass over the rows is one `np.bincount` on integer day keys;
+    week / month / quarter series, the day-of-week profile and cumulative
+    series are then computed from the (small) daily series.
+
+    Parameters
+    ----------
+    keys : array-like of int
+        Day number of each row, as returned by `day_keys`.
+    values : array-like of float
+        Value of each row to sum.
+    """
+
+    def __init__(self, keys, values):
+        keys = np.asarray(keys)
+        if keys.size == 0:
+            self.daily = pd.Series(dtype=float, index=pd.DatetimeIndex([], name='Date'))
+            return
+        first = int(keys.min())
+        totals = np.bincount(keys - first, weights=np.asarray(values, dtype=float))
+        dates = pd.date_range(pd.Timestamp(first, unit='D'), periods=len(totals), freq='D', name='Date')
+        self.daily = pd.Series(totals, index=dates)
+
+    def series(self, granularity='Month'):
+        """
+        Return the totals per period.
+
+        Parameters
+        ----------
+        granularity : str
+            One of the keys of `GRANULARITIES`.
+
+        Returns
+        -------
+        pd.Series
+            Totals indexed by period label.
+        """
+        periods = self.daily.index.to_period(GRANULARITIES[granularity])
+        totals = self.daily.groupby(periods).sum()
+        totals.index = totals.index.astype(str).rename(granularity)
+        return totals
+
+    def cumulative(self, granularity='Month'):
+        """Return the running total at the end of each period."""
+        return self.series(granularity).cumsum()
+
+    def day_of_week(self):
+        """Return the totals per weekday, Monday first."""
+        totals = self.daily.groupby(self.daily.index.dayofweek).sum()
+        totals = totals.reindex(range(7), fill_value=0.0)
+        totals.index = pd.CategoricalIndex(DAY_ORDER, categories=DAY_ORDER, ordered=True, name='Day of Week')
+        return totals
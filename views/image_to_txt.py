@@ -1,9 +1,26 @@
 import streamlit as st
-from PIL import Image
-import google.generativeai as genai
+import os
+import time
+from io import BytesIO
+from utils.extraction_cache import extraction_key, image_digest, load_extraction_cache
+from utils.image_preprocess import DEFAULT_MAX_EDGE, IMAGE_FORMATS, preprocess_image
+from utils.model_client import load_model_client, model_backend, show_client_stats
+from utils.extraction_jobs import load_job_registry
+from utils.ocr_engines import (
+    DEFAULT_PROMPT as PROMPT, GEMINI_REQUESTS_PER_MINUTE, GeminiEngine, RateLimiter, StubEngine, TesseractEngine,
+    run_batch,
+)
 
-# Configure the API key for Google Generative AI
-genai.configure(api_key=st.secrets["GEMINI_API_KEY"])
+OCR_ENGINES = ["Tesseract (local)", "Google Gemini"]
+# a local stand-in model for measuring time-to-first-text offline
+if os.environ.get('OCR_STUB_ENGINE'):
+    OCR_ENGINES.append("Stub (local test)")
+
+
+@st.cache_resource(show_spinner=False)
+def gemini_rate_limiter():
+    """Return the process-wide Gemini rate limiter, shared by every batch."""
+    return RateLimiter(GEMINI_REQUESTS_PER_MINUTE)
 
 def file_validation(image_file):
     """
@@ -47,51 +64,254 @@ def load_image():
 
 def load_model():
     """
-    Load the Google Generative AI model.
+    Load the shared model client.
+
+    The client is created once per process and reused by every session and
+    rerun; it adds timeouts, retries and a circuit breaker around the model.
+    Set `MODEL_BACKEND = "fake"` in the secrets or environment to use a local
+    stand-in instead of the Google API.
 
     Returns
     -------
-    model object or None
+    ModelClient or None
     """
-    model_name = st.secrets.get("MODEL_NAME")
+    backend = model_backend()
+    model_name = st.secrets.get("MODEL_NAME", "fake" if backend == "fake" else None)
     if not model_name:
         st.error("Model name is missing in secrets.")
         return None
     try:
-        model = genai.GenerativeModel(model_name=model_name)
-        return model
+        return load_model_client(model_name, backend)
     except Exception as e:
         st.error(f"Error loading model: {e}")
         return None
 
-def extract_text(model, image_file):
+def preprocess_settings():
+    """
+    Show the image preprocessing settings in the sidebar.
+
+    Returns
+    -------
+    dict or None
+        Keyword arguments of `preprocess_image`, or None when preprocessing
+        is turned off.
+    """
+    with st.sidebar.expander('Image Preprocessing'):
+        if not st.toggle('Preprocess images', value=True, help='Shrink images before sending them to the model.'):
+            return None
+        return {
+            'max_edge': st.number_input('Max edge (px)', min_value=0, max_value=8192, value=DEFAULT_MAX_EDGE, step=256),
+            'grayscale': st.checkbox('Grayscale', value=True),
+            'image_format': st.selectbox('Format', IMAGE_FORMATS),
+        }
+
+def extraction_tag(image_file, preprocess):
+    """Identify an extraction by its image content and preprocessing settings."""
+    return image_digest(image_file.getvalue()), tuple(sorted(preprocess.items())) if preprocess else None
+
+def prepared_image(image_file, preprocess):
+    """
+    Return the bytes sent for extraction, preprocessing the upload once per image and settings.
+
+    The result is kept in session state under the image's `extraction_tag`,
+    so reruns do not decode and re-encode the image again.
+    """
+    tag = extraction_tag(image_file, preprocess)
+    prepared = st.session_state.get('prepared_image')
+    if prepared is None or prepared[0] != tag:
+        image_bytes, report = image_file.getvalue(), None
+        if preprocess:
+            image_bytes, report = preprocess_image(image_bytes, **preprocess)
+        prepared = st.session_state['prepared_image'] = (tag, image_bytes, report)
+    st.session_state['preprocess_report'] = prepared[2]
+    return prepared[1]
+
+def record_latency(preprocess, ms, streamed=False):
+    """Keep the latency of one extraction in session state, per preprocessing mode and path."""
+    mode = 'preprocessed' if preprocess else 'original'
+    latencies = st.session_state.setdefault('model_latency_ms', {})
+    latencies.setdefault(f'{mode} (streamed)' if streamed else mode, []).append(ms)
+
+def extract_text(model, image_file, preprocess=None):
     """
     Extracts text from the provided image using the specified model.
 
+    Results are cached on disk by image content, model and prompt, so an
+    image already extracted in any session is returned without calling the
+    model.
+
     Parameters
     ----------
     model : GenerativeAI
         The model used to extract text from the image.
     image_file : UploadedFile
         The image file from which text will be extracted.
+    preprocess : dict, optional
+        Keyword arguments of `preprocess_image`; the image is sent as
+        uploaded when omitted.
 
     Returns
     -------
     str or None
         The extracted text if successful, otherwise None.
     """
+    from PIL import Image
+
     try:
-        image = Image.open(image_file)
-        prompt = "Extract text from the image:"
-        response = model.generate_content([image, '\n\n', prompt])
-        st.session_state['extracted_text'] = response.text  # Save to session state
-        return response.text
+        image_bytes = prepared_image(image_file, preprocess)
+        cache = load_extraction_cache()
+        key = extraction_key(image_bytes, model.model_name, PROMPT)
+        text = cache.get(key)
+        if text is None:
+            image = Image.open(BytesIO(image_bytes))
+            start = time.perf_counter()
+            response = model.generate_content([image, '\n\n', PROMPT])
+            text = response.text
+            record_latency(preprocess, (time.perf_counter() - start) * 1000)
+            cache.put(key, text)
+        # Save to session state, tagged with the image it was extracted from
+        st.session_state['extracted_text'] = text
+        st.session_state['extracted_image'] = extraction_tag(image_file, preprocess)
+        return text
     except Exception as e:
         st.error(f"Error extracting text: {e}")
         return None
 
+def stream_text(engine, image_file, preprocess=None):
+    """
+    Extract text from an image, writing it to the page as the engine produces it.
+
+    The extraction runs as a background job in the process-wide job
+    registry: a rerun while it is streaming replays the text received so
+    far and keeps following the same job instead of restarting it.
+
+    Parameters
+    ----------
+    engine : OcrEngine
+        The backend whose `stream` produces the text.
+    image_file : UploadedFile
+        The image file from which text will be extracted.
+    preprocess : dict, optional
+        Keyword arguments of `preprocess_image`.
+
+    Returns
+    -------
+    str or None
+        The extracted text if successful, otherwise None.
+    """
+    try:
+        image_bytes = prepared_image(image_file, preprocess)
+        cache = load_extraction_cache()
+        key = extraction_key(image_bytes, engine.cache_name, PROMPT)
+        text = cache.get(key)
+        if text is not None:
+            st.markdown(text)
+        else:
+            job = load_job_registry().start(key, engine, image_bytes, on_done=lambda text: cache.put(key, text))
+            text = st.write_stream(job.stream())
+            if job.error is not None:
+                st.error(f"Error extracting text: {job.error}")
+                return None
+            # a rerun reattaching to a finished job must not count it twice
+            if st.session_state.get('timed_job') is not job:
+                st.session_state['timed_job'] = job
+                record_latency(preprocess, (job.finished_at - job.started) * 1000, streamed=True)
+            if job.time_to_first_text is not None:
+                st.caption(f"First text after {job.time_to_first_text:,.2f} s, "
+                           f"complete after {job.finished_at - job.started:,.2f} s")
+    except Exception as e:
+        st.error(f"Error extracting text: {e}")
+        return None
+    st.session_state['extracted_text'] = text
+    return text
+
+def show_preprocess_report():
+    """Show the bytes saved by preprocessing and the model latency with and without it."""
+    report = st.session_state.get('preprocess_report')
+    if report:
+        st.caption(
+            f"Preprocessing: {report['original_bytes'] / 1024:,.0f} KB {report['original_size']} -> "
+            f"{report['processed_bytes'] / 1024:,.0f} KB {report['processed_size']}, "
+            f"{report['bytes_saved'] / 1024:,.0f} KB saved in {report['preprocess_ms']:,.0f} ms"
+        )
+    latencies = st.session_state.get('model_latency_ms', {})
+    means = {mode: sum(values) / len(values) for mode, values in latencies.items() if values}
+    if means:
+        st.caption('Mean model latency: ' + ', '.join(f'{mode} {ms:,.0f} ms' for mode, ms in means.items()))
+
+def load_engine(engine_name):
+    """
+    Build the selected OCR engine.
+
+    Returns
+    -------
+    OcrEngine or None
+        The engine, or None when the Gemini model could not be loaded.
+    """
+    if engine_name == "Tesseract (local)":
+        return TesseractEngine(lang=st.secrets.get("TESSERACT_LANG", "eng"))
+    if engine_name == "Stub (local test)":
+        return StubEngine()
+    model = load_model()
+    if model is None:
+        return None
+    return GeminiEngine(model, prompt=PROMPT, limiter=gemini_rate_limiter())
+
+def batch_extract(image_files, engine, max_workers, preprocess=None):
+    """
+    Extract the text of several images, showing progress as each one finishes.
+
+    Parameters
+    ----------
+    image_files : list of UploadedFile
+        The validated uploads.
+    engine : OcrEngine
+        The backend to run.
+    max_workers : int
+        Size of the worker pool.
+    preprocess : dict, optional
+        Keyword arguments of `preprocess_image` applied to every image.
+
+    Returns
+    -------
+    list of dict
+        One row per file with its name, status and extracted text.
+    """
+    results = [{'file': image_file.name, 'status': 'queued', 'text': None} for image_file in image_files]
+    # a file that cannot be decoded fails on its own row instead of aborting the batch
+    images, positions = [], []
+    for position, image_file in enumerate(image_files):
+        image_bytes = image_file.getvalue()
+        if preprocess:
+            try:
+                image_bytes = preprocess_image(image_bytes, **preprocess)[0]
+            except Exception as e:
+                results[position]['status'] = f'error: {e}'
+                continue
+        images.append(image_bytes)
+        positions.append(position)
+
+    failed = len(results) - len(images)
+    progress = st.progress(failed / len(results), text=f"{failed} of {len(results)} images done")
+    table = st.empty()
+    table.dataframe(results, hide_index=True, column_order=['file', 'status'])
+    cache = load_extraction_cache()
+    batch = run_batch(engine, images, max_workers, cache, PROMPT)
+    try:
+        for done, (index, text, error) in enumerate(batch, start=failed + 1):
+            result = results[positions[index]]
+            result['status'] = f'error: {error}' if error else 'done'
+            result['text'] = text
+            progress.progress(done / len(results), text=f"{done} of {len(results)} images done")
+            table.dataframe(results, hide_index=True, column_order=['file', 'status'])
+    finally:
+        # a rerun stops the script mid-loop; closing cancels the images not started yet
+        batch.close()
+    return results
+
 # Layout sections
-section = st.sidebar.radio('Go To', ["Introduction", "Upload Image", "Extracted Text", "Download"]) 
+section = st.sidebar.radio('Go To', ["Introduction", "Upload Image", "Extracted Text", "Batch", "Download"]) 
+preprocess = preprocess_settings()
 
 def load_layout(section):
     if section == "Introduction":
@@ -107,19 +327,52 @@ def load_layout(section):
     elif section == "Extracted Text":
         st.title("Extracted Text")
         image_file = st.session_state.get('image_file')
-        if image_file:
+        streaming = st.toggle("Stream text", value=True, help="Show the text as it is extracted.")
+        if image_file and streaming:
+            engine = load_engine(st.radio("Engine", OCR_ENGINES, index=1, horizontal=True))
+            if engine:
+                stream_text(engine, image_file, preprocess)
+                show_preprocess_report()
+                if isinstance(engine, GeminiEngine):
+                    show_client_stats(engine.model)
+            else:
+                st.error("Model could not be loaded.")
+        elif image_file:
             model = load_model()
             if model:
-                if 'extracted_text' not in st.session_state:
-                    extracted_text = extract_text(model, image_file)
+                if st.session_state.get('extracted_image') != extraction_tag(image_file, preprocess):
+                    extracted_text = extract_text(model, image_file, preprocess)
                 else:
                     extracted_text = st.session_state['extracted_text']
                 st.markdown(extracted_text)
+                show_preprocess_report()
+                show_client_stats(model)
             else:
                 st.error("Model could not be loaded.")
         else:
             st.error("Please upload an image first in the 'Upload Image' section.")
     
+    elif section == "Batch":
+        st.title("Batch Extraction")
+        image_files = st.file_uploader("Upload images", type=["jpg", "jpeg", "png", "webp"], accept_multiple_files=True)
+        image_files = [image_file for image_file in image_files if file_validation(image_file)]
+        engine_name = st.radio("Engine", OCR_ENGINES, horizontal=True)
+        max_workers = st.slider("Workers", min_value=1, max_value=max(8, os.cpu_count() or 1), value=os.cpu_count() or 1)
+        if image_files and st.button(f"Extract {len(image_files)} images"):
+            engine = load_engine(engine_name)
+            if engine:
+                st.session_state['batch_results'] = batch_extract(image_files, engine, max_workers, preprocess)
+            else:
+                st.error("Model could not be loaded.")
+        for result in st.session_state.get('batch_results') or []:
+            with st.expander(f"{result['file']} ({result['status']})"):
+                st.markdown(result['text'] or '')
+        batch_text = '\n\n'.join(
+            f"# {result['file']}\n\n{result['text']}" for result in st.session_state.get('batch_results') or [] if result['text']
+        )
+        if batch_text:
+            st.download_button("Download All Extracted Text", batch_text, file_name="extracted_text.txt")
+
     elif section == "Download":
         st.title("Download")
         extracted_text = st.session_state.get('extracted_text')
@@ -127,6 +380,7 @@ def load_layout(section):
             st.download_button("Download Extracted Text", extracted_text, file_name="extracted_text.txt")
             st.success("Extracted text downloaded successfully!")
             st.session_state['extracted_text'] = None
+            st.session_state['extracted_image'] = None
             st.session_state['image_file'] = None
         else:
             st.error("No extracted text available. Please extract text first.")
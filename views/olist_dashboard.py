@@ -0,0 +1,88 @@
+import streamlit as st
+import plotly.express as px
+from utils.olist_cube import ALL, PRODUCT_MEASURES, ITEM_MEASURES, load_cube
+from utils.dataset_registry import show_dataset_stats
+
+# every chart below selects rows of a precomputed cube (see utils.olist_cube), nothing is re-grouped per click
+
+products_cube = load_cube('products')
+sellers_cube = load_cube('sellers')
+category_state_cube = load_cube('category_state')
+
+st.title('📦Olist E-commerce Dashboard')
+st.markdown('---')
+
+sections = ["Products", "Sellers"]
+if category_state_cube is not None:
+    sections.append("Category by State")
+section = st.sidebar.radio('Go To', sections)
+
+STATISTICS = ['count', 'sum', 'min', 'p25', 'p50', 'p75', 'p90', 'max']
+
+
+def product_drill_down():
+    st.markdown("## Products by Category")
+    measure = st.selectbox('Measure', PRODUCT_MEASURES)
+    statistic = st.selectbox('Statistic', STATISTICS, index=STATISTICS.index('p50'))
+
+    by_measure = products_cube[products_cube['measure'] == measure]
+    overall = by_measure[by_measure['category'] == ALL]
+    categories = by_measure[by_measure['category'] != ALL].sort_values(statistic, ascending=False)
+
+    col1, col2, col3 = st.columns(3, gap='small', vertical_alignment='top')
+    with col1:
+        st.metric(label="Products", value=f"{int(overall['count'].sum()):,}")
+    with col2:
+        st.metric(label="Median", value=f"{overall['p50'].iloc[0]:,.1f}" if len(overall) else '-')
+    with col3:
+        st.metric(label="Categories", value=f"{len(categories):,}")
+
+    st.plotly_chart(px.bar(categories.head(25), x=statistic, y='category', orientation='h',
+                           title=f'{statistic} of {measure} per Category (Top 25)'))
+
+    category = st.selectbox('Drill Down Into Category', [ALL, *sorted(categories['category'])])
+    st.dataframe(products_cube[products_cube['category'] == category].drop(columns='category'),
+                 width=1000, hide_index=True)
+
+
+def seller_drill_down():
+    st.markdown("## Sellers by State")
+    states = sellers_cube[(sellers_cube['state'] != ALL) & (sellers_cube['city'] == ALL)].sort_values('sellers', ascending=False)
+    state = st.selectbox('Drill Down Into State', [ALL, *states['state']])
+
+    if state == ALL:
+        st.metric(label="Sellers", value=f"{int(states['sellers'].sum()):,}")
+        st.plotly_chart(px.bar(states, x='state', y='sellers', title='Sellers per State'))
+    else:
+        cities = sellers_cube[(sellers_cube['state'] == state) & (sellers_cube['city'] != ALL)].sort_values('sellers', ascending=False)
+        st.metric(label=f"Sellers in {state}", value=f"{int(cities['sellers'].sum()):,}")
+        st.plotly_chart(px.bar(cities.head(25), x='city', y='sellers', title=f'Sellers per City in {state} (Top 25)'))
+        st.dataframe(cities.drop(columns='state'), width=1000, hide_index=True)
+
+
+def category_state_drill_down():
+    st.markdown("## Order Items by Category and State")
+    measure = st.selectbox('Measure', ITEM_MEASURES)
+    statistic = st.selectbox('Statistic', STATISTICS, index=STATISTICS.index('sum'))
+
+    by_measure = category_state_cube[category_state_cube['measure'] == measure]
+    cells = by_measure[(by_measure['category'] != ALL) & (by_measure['state'] != ALL)]
+    st.plotly_chart(px.density_heatmap(cells, x='state', y='category', z=statistic, histfunc='sum',
+                                       title=f'{statistic} of {measure} per Category and Seller State', height=900))
+
+    category = st.selectbox('Drill Down Into Category', [ALL, *sorted(cells['category'].unique())])
+    by_state = by_measure[(by_measure['category'] == category) & (by_measure['state'] != ALL)]
+    st.plotly_chart(px.bar(by_state.sort_values(statistic, ascending=False), x='state', y=statistic,
+                           title=f'{statistic} of {measure} per Seller State ({category})'))
+
+
+def load_section(section):
+    if section == "Products":
+        product_drill_down()
+    elif section == "Sellers":
+        seller_drill_down()
+    elif section == "Category by State":
+        category_state_drill_down()
+
+load_section(section)
+show_dataset_stats()
@@ -0,0 +1,128 @@
+import streamlit as st
+import plotly.express as px
+from utils.olist_db import run_query
+
+# every aggregation below runs inside DuckDB; only the grouped results reach pandas
+
+CATEGORY_SQL = """
+    SELECT COALESCE(t.product_category_name_english, p.product_category_name, 'unknown') AS category
+    FROM products p
+    LEFT JOIN category_translation t USING (product_category_name)
+    GROUP BY 1
+    ORDER BY 1
+"""
+
+STATE_SQL = """
+    SELECT DISTINCT seller_state AS state
+    FROM sellers
+    ORDER BY 1
+"""
+
+PRODUCTS_BY_CATEGORY_SQL = """
+    SELECT
+        COALESCE(t.product_category_name_english, p.product_category_name, 'unknown') AS category,
+        COUNT(*) AS products,
+        ROUND(AVG(p.product_photos_qty), 2) AS avg_photos,
+        ROUND(AVG(p.product_weight_g), 1) AS avg_weight_g
+    FROM products p
+    LEFT JOIN category_translation t USING (product_category_name)
+    WHERE len($1::VARCHAR[]) = 0
+       OR list_contains($1::VARCHAR[], COALESCE(t.product_category_name_english, p.product_category_name, 'unknown'))
+    GROUP BY 1
+    ORDER BY products DESC
+"""
+
+SELLERS_BY_STATE_SQL = """
+    SELECT
+        seller_state AS state,
+        COUNT(*) AS sellers,
+        COUNT(DISTINCT seller_city) AS cities
+    FROM sellers
+    WHERE len($1::VARCHAR[]) = 0 OR list_contains($1::VARCHAR[], seller_state)
+    GROUP BY 1
+    ORDER BY sellers DESC
+"""
+
+DIMENSION_STATS_SQL = """
+    SELECT
+        dimension,
+        COUNT(value) AS products,
+        MIN(value) AS min,
+        ROUND(AVG(value), 1) AS mean,
+        quantile_cont(value, 0.5) AS median,
+        quantile_cont(value, 0.9) AS p90,
+        MAX(value) AS max
+    FROM (
+        SELECT p.*
+        FROM products p
+        LEFT JOIN category_translation t USING (product_category_name)
+        WHERE len($1::VARCHAR[]) = 0
+           OR list_contains($1::VARCHAR[], COALESCE(t.product_category_name_english, p.product_category_name, 'unknown'))
+    )
+    UNPIVOT (value FOR dimension IN (
+        product_weight_g, product_length_cm, product_height_cm, product_width_cm, product_photos_qty
+    ))
+    GROUP BY 1
+    ORDER BY 1
+"""
+
+st.title('🛒Olist E-commerce Explorer')
+st.markdown('---')
+
+section = st.sidebar.radio('Go To', ["Introduction", "Products", "Sellers"])
+
+selected_categories = st.sidebar.multiselect(
+    'Select Categories',
+    run_query(CATEGORY_SQL)['category'].tolist(),
+    help='Leave empty to include every category.'
+)
+
+selected_states = st.sidebar.multiselect(
+    'Select Seller States',
+    run_query(STATE_SQL)['state'].tolist(),
+    help='Leave empty to include every state.'
+)
+
+
+def load_section(section):
+    if section == "Introduction":
+        st.markdown(
+                """
+                    ## About the Data
+                    The Olist dataset is a public Brazilian e-commerce dataset. This page explores:
+
+                    - **Products**: category, photo count, weight and package dimensions.
+                    - **Sellers**: city and state of every seller.
+                    - **Category Translation**: English names of the Portuguese product categories.
+
+                    Queries run in an embedded DuckDB database over columnar copies of the CSV files,
+                    and their results are cached, so the page stays responsive as order tables are added.
+                """
+        )
+
+    elif section == "Products":
+        st.markdown("## Products by Category")
+        products_by_category = run_query(PRODUCTS_BY_CATEGORY_SQL, (selected_categories,))
+        col1, col2 = st.columns(2, gap='small', vertical_alignment='top')
+        with col1:
+            st.metric(label="Products", value=f"{int(products_by_category['products'].sum()):,}")
+        with col2:
+            st.metric(label="Categories", value=f"{len(products_by_category):,}")
+        st.plotly_chart(px.bar(products_by_category.head(20), x='products', y='category', orientation='h', title='Top Categories by Product Count'))
+        st.dataframe(products_by_category, width=1000, hide_index=True)
+
+        st.markdown("## Product Dimensions")
+        st.dataframe(run_query(DIMENSION_STATS_SQL, (selected_categories,)), width=1000, hide_index=True)
+
+    elif section == "Sellers":
+        st.markdown("## Sellers by State")
+        sellers_by_state = run_query(SELLERS_BY_STATE_SQL, (selected_states,))
+        col1, col2 = st.columns(2, gap='small', vertical_alignment='top')
+        with col1:
+            st.metric(label="Sellers", value=f"{int(sellers_by_state['sellers'].sum()):,}")
+        with col2:
+            st.metric(label="States", value=f"{len(sellers_by_state):,}")
+        st.plotly_chart(px.bar(sellers_by_state, x='state', y='sellers', title='Sellers per State'))
+        st.dataframe(sellers_by_state, width=1000, hide_index=True)
+
+load_section(section)
@@ -1,31 +1,44 @@
-import pyproj
 import streamlit as st 
-import pandas as pd 
-import geopandas as gpd 
 import plotly.express as px 
-from matplotlib import pyplot as plt
-import json
-
-@st.cache_data()
-def load_data():
-    POP_DATASET = 'datasets/kenya-population-distribution-2019-updated.csv'
-    KENYA_GEO_SHP_FILE = 'datasets/kenya-counties-geopandas-updated-merged.shp'
-    GEO_JSON_FILE = 'datasets/kenya-counties-geopandas-geojson.json'
-    df = pd.read_csv(POP_DATASET)
-    gd = gpd.read_file(KENYA_GEO_SHP_FILE)
-    geo_json_file = GEO_JSON_FILE
-    return df, gd,geo_json_file
+import numpy as np
+import os
+from utils.compact import compact_dataset
+from utils.dataset_cache import read_csv_cached, read_geo_cached
+from utils.dataset_registry import load_dataset, show_dataset_stats
+from utils.choropleth import choropleth_map, publish_geometry
+from utils.geometry import geojson_artifact, pick_level
+from utils.range_index import SortedColumn
+from utils.regions import RegionEngine, parent_columns
+
+POP_DATASET = os.environ.get('POP_DATASET', 'datasets/kenya-population-distribution-2019-updated.csv')
+KENYA_GEO_SHP_FILE = os.environ.get('KENYA_GEO_SHP_FILE', 'datasets/kenya-counties-geopandas-updated-merged.shp')
+MAP_WIDTH, MAP_HEIGHT = 800, 600
+GD_COLUMNS = ['County', 'Male', 'Female', 'Intersex', 'Total', 'Percentage', 'PERIMETER', 'AREA', 'OBJECTID']
+
+# every dataset is loaded through the shared registry: one copy of the data per process
+def load_data(pop_dataset, shp_file):
+    df_name, gd_name = f'population:{pop_dataset}', f'counties:{shp_file}'
+    df = load_dataset(df_name, lambda: compact_dataset(df_name, read_csv_cached(pop_dataset)), pop_dataset)
+    gd = load_dataset(gd_name, lambda: compact_dataset(gd_name, read_geo_cached(shp_file, columns=GD_COLUMNS)), shp_file)
+    return df, gd
+
+df, gd = load_data(POP_DATASET, KENYA_GEO_SHP_FILE)
+
+# spatial index and county / national roll-ups, built once per shapefile version
+region_engine = load_dataset(
+    f'county-regions:{KENYA_GEO_SHP_FILE}',
+    lambda: RegionEngine(gd, 'County', parent_columns(gd, 'County')),
+    KENYA_GEO_SHP_FILE,
+)
 
-df, gd, geo_json_file = load_data()
+# sorted index behind the population range sliders
+total_index = load_dataset(f'county-total-index:{KENYA_GEO_SHP_FILE}', lambda: SortedColumn(gd['Total']), KENYA_GEO_SHP_FILE)
 
 new_gd = gd[['County', 'Male', 'Female', 'Intersex', 'Total', 'Percentage','PERIMETER' ,'AREA','geometry', 'OBJECTID']]
 
 data_gd = gd[['County', 'Male', 'Female', 'Intersex', 'Total', 'Percentage']]
 
 
-geo_json = json.loads(gd.to_json())
-
-
 st.title('📈Population Metrics Dashboard')
 
 #STEP 1: HEADER TEXT ON DATASET 
@@ -73,36 +86,20 @@ selected_counties = st.multiselect(
 
 filtered_gd = new_gd[new_gd['County'].isin(selected_counties)]
 
-if selected_counties: 
-
-    county_name =', '.join( filtered_gd['County'].unique())
-    total_population = filtered_gd['Total'].sum()
-    total_male = filtered_gd['Male'].sum()
-    total_female = filtered_gd['Female'].sum()
-    total_intersex = filtered_gd['Intersex'].sum()
-    total_perimeter = filtered_gd['PERIMETER'].sum()
-    total_area = filtered_gd['AREA'].sum()
-    mean_population_density = filtered_gd['Total'].sum() / filtered_gd['AREA'].sum()
-    ratio_of_male_to_female = total_male / total_female
-    ratio_of_female_to_male = total_female / total_male
-    mean_area = filtered_gd['AREA'].mean()
-    median_area = filtered_gd['AREA'].median()
-
-else: 
-    county_name = 'Kenya Total'
-    area_name = 'Kenya Area'
-    perimeter_name = 'Kenya Perimeter'
-    total_population = new_gd['Total'].sum()
-    total_male = new_gd['Male'].sum()
-    total_female = new_gd['Female'].sum()
-    total_intersex = new_gd['Intersex'].sum()
-    total_perimeter = new_gd['PERIMETER'].sum()
-    total_area = new_gd['AREA'].sum()
-    mean_population_density = new_gd['Total'].sum() / new_gd['AREA'].sum()
-    ratio_of_male_to_female = total_male / total_female
-    ratio_of_female_to_male = total_female / total_male
-    mean_area = new_gd['AREA'].mean()
-    median_area = new_gd['AREA'].median()
+# metrics come from the pre-summed county rows, not from the raw geometries
+region_summary = region_engine.summary(selected_counties)
+county_name = ', '.join(filtered_gd['County'].unique()) if selected_counties else 'Kenya Total'
+total_population = region_summary['total_population']
+total_male = region_summary['total_male']
+total_female = region_summary['total_female']
+total_intersex = region_summary['total_intersex']
+total_perimeter = region_summary['total_perimeter']
+total_area = region_summary['total_area']
+mean_population_density = region_summary['mean_population_density']
+ratio_of_male_to_female = region_summary['ratio_of_male_to_female']
+ratio_of_female_to_male = region_summary['ratio_of_female_to_male']
+mean_area = region_summary['mean_area']
+median_area = region_summary['median_area']
 
 
 col1, col2, col3 = st.columns(3, gap='small', vertical_alignment='top')
@@ -153,41 +150,21 @@ selected_field = st.selectbox(
 
 st.write('\n')
 
-fig = px.choropleth(
-    new_gd, 
+# geometry reaches the browser once per session; changing the field only restyles the map
+geometry_lod = pick_level(new_gd.total_bounds, MAP_WIDTH, MAP_HEIGHT)
+geometry_url = publish_geometry(geojson_artifact(KENYA_GEO_SHP_FILE, geometry_lod))
+
+choropleth_map(
+    geometry_url,
+    new_gd,
+    field=selected_field,
+    hover_fields=['Total', 'Male', 'Female', 'Intersex', 'Percentage', 'PERIMETER', 'AREA'],
+    name_field='County',
     title=f'Kenya Population Distribution 2019 Census Choropleth Map: {selected_field}',
-    geojson=geo_json,
-    locations=new_gd.index,
-    width=800,
-    height=600,
-    color= selected_field,
-    color_continuous_scale='Blues',
-    hover_name='County',
-    hover_data={
-        'Total': True, 
-        'Male' : True,
-        'Female' : True,
-        'Intersex' : True,
-        'Percentage' : True,
-        'PERIMETER' : True,
-        'AREA' : True
-        },
-    projection='mercator'
+    width=MAP_WIDTH,
+    height=MAP_HEIGHT,
+    key='population_choropleth',
 )
-fig.update_geos(fitbounds="locations", visible=False)
-
-fig.update_layout(
-    coloraxis_colorbar=dict(
-        title=f'{selected_field}',
-        ticks = 'outside', 
-        tickvals = [new_gd[selected_field].min(), new_gd[selected_field].max()],
-        ticktext = [f'{new_gd[selected_field].min()}', f'{new_gd[selected_field].max()}'],
-    ),
-     paper_bgcolor='rgba(0,0,0,0)',  # Transparent paper background
-    plot_bgcolor='rgba(0,0,0,0)'    # Transparent plot background
-)
-
-st.plotly_chart(fig)
 
 
 # BAR CHART
@@ -198,10 +175,11 @@ st.header('📈 Population Metrics Bar Chart')
 
 
 #create a min and max st slider 
-min_value = st.slider('Min Total Population', min_value=int(new_gd['Total'].min()), max_value=int(new_gd['Total'].max()), value=int(new_gd['Total'].min()))
-max_value = st.slider('Max Total Population', min_value=int(new_gd['Total'].min()), max_value=int(new_gd['Total'].max()), value=int(new_gd['Total'].max()))
+min_total, max_total = int(total_index.min), int(total_index.max)
+min_value = st.slider('Min Total Population', min_value=min_total, max_value=max_total, value=min_total)
+max_value = st.slider('Max Total Population', min_value=min_total, max_value=max_total, value=max_total)
 
-filtered_bar_gd = new_gd[(new_gd['Total'] >= min_value) & (new_gd['Total'] <= max_value)]
+filtered_bar_gd = new_gd.take(np.sort(total_index.positions(min_value, max_value)))
 
 st.write(f'\nShowing results between: {min_value} and {max_value}')
 
@@ -226,4 +204,6 @@ fig = px.bar(
     hover_data=['Total', 'PERIMETER', 'AREA'],
 )
 
-st.plotly_chart(fig)
\ No newline at end of file
+st.plotly_chart(fig)
+
+show_dataset_stats()
@@ -1,32 +1,25 @@
 import streamlit as st
 import pandas as pd
-import numpy as np
 import plotly.express as px
 from plotly.subplots import make_subplots
-from io import BytesIO
-
-
-@st.cache_data()
-def load_data():
-    csv_file = 'datasets/retail_sales_dataset.csv'
-    df = pd.read_csv(csv_file, index_col= 0)
-    return df
-
-df = load_data()
-df['Date'] = pd.to_datetime(df['Date']).dt.strftime('%Y-%m-%d')
-
-# AGE GROUP COLUMN VALUE BIN TRANSFORMATION
-min_age_group = df['Age'].min()-1
-max_age_group = df['Age'].max()
-
-no_bins = 6
-bins = np.linspace(min_age_group, max_age_group, no_bins + 1)
-age_bins = [int(bin) for bin in bins]
-labels = [f'{bin[0]}-{bin[1]}' for bin in zip(age_bins, age_bins[1:])]
-df['Age Group'] = pd.cut(df['Age'], bins=age_bins, labels=labels)
-
-# CREATE COLUMN WITH REVENUE PER EACH UNIT OF SALES 
-df['Revenue Per Unit'] = df['Total Amount'] / df['Quantity']
+from utils.chart_data import count_by, histogram, sum_by
+from utils.dataset_cache import dataset_version
+from utils.dataset_registry import show_dataset_stats
+from utils.export import build_export
+from utils.figure_cache import load_figure_cache
+from utils.kpis import period_kpis
+from utils.filter_index import selection_key, take_rows
+from utils.sales_data import SALES_CSV_FILE, load_sales_data, load_sales_filter_index, load_sales_range_index
+from utils.sales_stream import aggregate_cells, load_sales_aggregator
+from utils.time_rollup import GRANULARITIES, TimeRollup
+
+
+df = load_sales_data()
+filter_index = load_sales_filter_index()
+range_index = load_sales_range_index()
+aggregator = load_sales_aggregator()
+figure_cache = load_figure_cache()
+version = dataset_version(SALES_CSV_FILE)
 
 
 # PAGE TITLE HEADING
@@ -44,54 +37,77 @@ section = st.sidebar.radio('Go To',["Introduction", "Metrics", "Customer Insight
 ##-- SIDEBAR MULTISELECT FIELDS --##
 selected_categories = st.sidebar.multiselect(
     'Select Categories',
-    df['Product Category'].unique(),
-    default=df['Product Category'].unique()
+    filter_index.values('Product Category'),
+    default=filter_index.values('Product Category')
 )
 
 selected_gender = st.sidebar.multiselect(
     'Select Gender',
-    df['Gender'].unique(),
-    default=df['Gender'].unique()
+    filter_index.values('Gender'),
+    default=filter_index.values('Gender')
 )
 
 selected_age_group = st.sidebar.multiselect(
     'Select Age Group',
-    df['Age Group'].tolist(), 
-    default=df['Age Group'].cat.categories.to_list()
+    filter_index.values('Age Group'),
+    default=filter_index.values('Age Group')
 )
 
+##-- SIDEBAR RANGE SLIDERS --##
+min_age, max_age = (int(bound) for bound in range_index.bounds('Age'))
+selected_age_range = st.sidebar.slider('Age', min_value=min_age, max_value=max_age, value=(min_age, max_age))
+
+min_amount, max_amount = (int(bound) for bound in range_index.bounds('Total Amount'))
+selected_amount_range = st.sidebar.slider('Total Amount', min_value=min_amount, max_value=max_amount, value=(min_amount, max_amount))
+
 # selected categories display section 
-if selected_categories or selected_gender or selected_age_group:
-    filtered_df = df.copy()
-    
-    if selected_categories:
-        filtered_df = filtered_df[filtered_df['Product Category'].isin(selected_categories)]
-    
-    if selected_gender:
-        filtered_df = filtered_df[filtered_df['Gender'].isin(selected_gender)]
-    
-    if selected_age_group:
-        filtered_df = filtered_df[filtered_df['Age Group'].isin(selected_age_group)]
-else:
-    filtered_df = df
+selections = {
+    'Product Category': selected_categories,
+    'Gender': selected_gender,
+    'Age Group': selected_age_group,
+}
+ranges = range_index.active({'Age': selected_age_range, 'Total Amount': selected_amount_range})
+filtered_df = take_rows(df, range_index.rows(ranges, base=filter_index.mask(selections)))
+filter_key = selection_key(selections, ranges)
 
 # metrics section 
-# data metrics group by and aggregation of column fields 
-total_sales = filtered_df['Total Amount'].sum()
-total_quantity_sold = filtered_df['Quantity'].sum()
-average_sales = filtered_df['Total Amount'].mean()
-number_of_transactions = filtered_df.shape[0]
-average_order_value = total_sales / filtered_df['Customer ID'].nunique()
-total_avg_revenue_per_unit = filtered_df['Revenue Per Unit'].mean()
-avg_cum_sales = filtered_df['Total Amount'].sum() / number_of_transactions
-avg_monthly_sales = filtered_df['Total Amount'].sum() / 12
+# all additive metrics come from one grouped pass over the streamed per-cell aggregates;
+# cells do not split on amount, so range filters aggregate the filtered rows instead
+if ranges:
+    selected_cells = aggregate_cells(filtered_df).reset_index()
+else:
+    selected_cells = aggregator.select(selections)
+months = sorted(selected_cells['Month'].unique())
+compare_month = st.sidebar.selectbox(
+    'Compare Month',
+    months[::-1],
+    help='Metric deltas compare this month with the month before it.'
+)
+kpis = period_kpis(selected_cells, period='Month', current=compare_month)
+totals = kpis['totals']
+unique_customers = filtered_df['Customer ID'].nunique()
+
+total_sales = totals['Total Sales']
+total_quantity_sold = totals['Total Quantity Sold']
+average_sales = totals['Average Sales']
+number_of_transactions = totals['Number of Transactions']
+average_order_value = total_sales / unique_customers if unique_customers else 0.0
+total_avg_revenue_per_unit = totals['Avg Revenue Per Unit']
+avg_cum_sales = average_sales
+avg_monthly_sales = totals['Average Monthly Sales']
+
+def kpi_delta(name, fmt):
+    delta = kpis['deltas'].get(name)
+    if delta is None or pd.isna(delta):
+        return None
+    return fmt.format(delta)
 
 # METRICS DISPLAY SECTION #
 def col_dashboard():
     col1, col2, col3 = st.columns(3, gap='small', vertical_alignment='top')
     with col1: 
-        st.metric(label="Total Sales", value=f'${total_sales:,}')
-        st.metric(label="Total Quantity Sold", value=f'{total_quantity_sold:,} pcs')
+        st.metric(label="Total Sales", value=f'${total_sales:,.0f}')
+        st.metric(label="Total Quantity Sold", value=f'{total_quantity_sold:,.0f} pcs')
         st.metric(label="Average Monthly Sales", value=f'${avg_monthly_sales:,.2f}')
         
     with col2:
@@ -99,9 +115,33 @@ def col_dashboard():
         st.metric(label="Average Order Value", value=f'${average_order_value:,.2f}')
         st.metric(label="Average Cumulative Sales", value=f'${avg_cum_sales:,.2f}')
     with col3:
-        st.metric(label="Unique Customers", value=f"{filtered_df['Customer ID'].nunique():,}")
+        st.metric(label="Unique Customers", value=f"{unique_customers:,}")
         st.metric(label="Avg Revenue Per Unit", value=f'${total_avg_revenue_per_unit:,.2f}')
         st.metric(label="Number of Transactions", value=f"{number_of_transactions:,}")
+    month_comparison()
+
+def month_comparison():
+    # the compare month's own KPIs, with deltas against the month before it
+    if kpis['current'] is None:
+        return
+    month = kpis['by_period'].loc[kpis['current']]
+    if kpis['previous'] is not None:
+        st.subheader(f"{kpis['current']} vs {kpis['previous']}")
+    else:
+        st.subheader(f"{kpis['current']}")
+    col1, col2, col3 = st.columns(3, gap='small', vertical_alignment='top')
+    with col1:
+        st.metric(label="Total Sales", value=f"${month['Total Sales']:,.0f}", delta=kpi_delta('Total Sales', '{:,.0f}'))
+        st.metric(label="Total Quantity Sold", value=f"{month['Total Quantity Sold']:,.0f} pcs", delta=kpi_delta('Total Quantity Sold', '{:,.0f}'))
+    with col2:
+        st.metric(label="Average Sales", value=f"${month['Average Sales']:,.2f}", delta=kpi_delta('Average Sales', '{:,.2f}'))
+        st.metric(label="Avg Revenue Per Unit", value=f"${month['Avg Revenue Per Unit']:,.2f}", delta=kpi_delta('Avg Revenue Per Unit', '{:,.2f}'))
+    with col3:
+        st.metric(label="Number of Transactions", value=f"{int(month['Number of Transactions']):,}", delta=kpi_delta('Number of Transactions', '{:,.0f}'))
+
+def monthly_kpis_display():
+    st.subheader('Monthly Breakdown')
+    st.dataframe(kpis['by_period'], width=1000)
 
 def selected_catergories_display():
     selected_categories_str = ', '.join(str(x) for x in selected_categories)
@@ -119,34 +159,42 @@ def selected_catergories_display():
         st.write(f'{selected_agegroup_str}')
 
 ## -- CHART DISTRIBUTION --##
+def cached_figure(chart_id, build, *args):
+    # figures are shared across sessions and reruns for the same filters
+    return figure_cache.get_or_build(chart_id, filter_key, version, build, *args)
+
 def bar_chart_by_category():
-    fig = px.bar(filtered_df,title="Total Sales by Category" ,x='Product Category', y='Total Amount', color='Product Category')
+    sales_by_category = sum_by(filtered_df, ['Product Category'])
+    fig = px.bar(sales_by_category,title="Total Sales by Category" ,x='Product Category', y='Total Amount', color='Product Category')
     return fig
 
 def pie_chart_by_gender():
-    fig = px.pie(filtered_df,title="Total Sales by Gender" ,values='Total Amount', names='Gender')
+    sales_by_gender = sum_by(filtered_df, ['Gender'])
+    fig = px.pie(sales_by_gender,title="Total Sales by Gender" ,values='Total Amount', names='Gender')
     return fig
 def subplots_chart():
     fig = make_subplots(rows=2, cols=2, subplot_titles=("Gender Distribution", "Age Distribution", "Sales by Gender and Age Group", "Top Product Categories by Gender"))
 
 # Gender Distribution
-    fig_gender_dist = px.histogram(filtered_df, x='Gender', title="Gender Distribution")
+    fig_gender_dist = px.bar(count_by(filtered_df, 'Gender'), x='Gender', y='count', title="Gender Distribution")
     for trace in fig_gender_dist.data:
         fig.add_trace(trace, row=1, col=1)
 
     # Age Distribution
-    fig_age_dist = px.histogram(filtered_df, x='Age', nbins=10, title="Age Distribution")
+    age_dist, age_bin_width = histogram(filtered_df['Age'], nbins=10)
+    fig_age_dist = px.bar(age_dist, x='Age', y='count', title="Age Distribution")
+    fig_age_dist.update_traces(width=age_bin_width)
     for trace in fig_age_dist.data:
         fig.add_trace(trace, row=1, col=2)
 
     # Sales by Gender and Age Group
-    sales_by_gender_age = filtered_df.groupby(['Gender', 'Age Group'])['Total Amount'].sum().reset_index()
+    sales_by_gender_age = sum_by(filtered_df, ['Gender', 'Age Group'])
     fig_sales_by_gender_age = px.bar(sales_by_gender_age, x='Gender', y='Total Amount', color='Age Group', title="Sales by Gender and Age Group")
     for trace in fig_sales_by_gender_age.data:
         fig.add_trace(trace, row=2, col=1)
 
     # Top Product Categories by Gender
-    top_categories_by_gender = filtered_df.groupby(['Gender', 'Product Category'])['Total Amount'].sum().reset_index()
+    top_categories_by_gender = sum_by(filtered_df, ['Gender', 'Product Category'])
     fig_top_categories_by_gender = px.bar(top_categories_by_gender, x='Total Amount', y='Product Category', color='Gender', orientation='h', title="Top Product Categories by Gender")
     for trace in fig_top_categories_by_gender.data:
         fig.add_trace(trace, row=2, col=2)
@@ -155,54 +203,61 @@ def subplots_chart():
     fig.update_layout(height=800, width=800, title_text="Customer Insights")
     return fig
 
-def sales_by_month():
-    filtered_df['Date'] = pd.to_datetime(filtered_df['Date'])
-    filtered_df['Month'] = filtered_df['Date'].dt.to_period('M')
-    filtered_df['Month'] = filtered_df['Month'].astype(str)
-    sales_by_month = filtered_df.groupby('Month')['Total Amount'].sum().reset_index()
-    fig_sales_over_time = px.line(sales_by_month, x='Month', y='Total Amount', title='Sales Over Time')
+@st.cache_data(show_spinner=False, max_entries=32)
+def load_time_rollup(_filtered_df, version, filter_key):
+    return TimeRollup(_filtered_df['Day Key'], _filtered_df['Total Amount'])
+
+def sales_over_time(granularity):
+    rollup = load_time_rollup(filtered_df, version, filter_key)
+    sales_over_time = rollup.series(granularity).rename('Total Amount').reset_index()
+    fig_sales_over_time = px.line(sales_over_time, x=granularity, y='Total Amount', title='Sales Over Time')
     return fig_sales_over_time
 
 ## -- DOWNLOAD DATASET TO CSV OR EXCEL FILE -- ##
+EXPORT_FORMATS = {
+    'CSV': ("Sales_Dataset.csv", "text/csv"),
+    'Excel': ("Sales_Data.xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+}
+
+EXPORT_EXCLUDED_COLUMNS = ['Day Key', 'Month', 'Day of Week']
+
 def export_to_file():
-    csv_file = df.to_csv(index=False)
-    output = BytesIO()
-    with pd.ExcelWriter(output, engine='openpyxl') as w:
-        df.to_excel(w, index=False, sheet_name='Yealy_Sales_Data')
-        w.close()
-    excel_file = output.getvalue()
-    st.dataframe(df)
-    col1, col2 = st.columns(2, vertical_alignment='top', gap='small')
-    with col1: 
-        st.download_button(
-            label="Download as CSV",
-            data = csv_file, 
-            file_name = "Sales_Dataset.csv",
-            mime="text/csv"
-        )
-    with col2:
-        st.download_button(
-            label="Download as Excel File",
-            data = excel_file,
-            file_name="Sales_Data.xlsx",
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-        )
+    only_filtered = st.checkbox('Only export the filtered rows', value=True)
+    # the helper columns behind the charts are not part of the dataset
+    export_df = (filtered_df if only_filtered else df).drop(columns=EXPORT_EXCLUDED_COLUMNS)
+    st.dataframe(export_df)
+    file_format = st.radio('File format', list(EXPORT_FORMATS), horizontal=True)
+    export_key = (
+        version,
+        filter_key if only_filtered else (),
+        file_format,
+    )
+    # files are only serialized on request, then served from the cache
+    if st.button(f'Prepare {file_format} file'):
+        st.session_state['sales_export_key'] = export_key
+    if st.session_state.get('sales_export_key') == export_key:
+        file_name, mime = EXPORT_FORMATS[file_format]
+        with st.spinner('Preparing file...'):
+            export_file = build_export(export_df, export_key, file_format, sheet_name='Yealy_Sales_Data')
+        with open(export_file, 'rb') as f:
+            st.download_button(
+                label=f"Download as {file_format}",
+                data=f,
+                file_name=file_name,
+                mime=mime
+            )
     
 
 def sales_by_day_of_the_week():
-    filtered_df['Date'] = pd.to_datetime(filtered_df['Date'])
-    filtered_df['Day of Week'] = filtered_df['Date'].dt.day_name()
-    day_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-    filtered_df['Day of Week'] = pd.Categorical(filtered_df['Day of Week'], categories=day_order, ordered=True)
-    sales_by_day_of_week = filtered_df.groupby('Day of Week')['Total Amount'].sum().reset_index()
+    rollup = load_time_rollup(filtered_df, version, filter_key)
+    sales_by_day_of_week = rollup.day_of_week().rename('Total Amount').reset_index()
     fig_sales_by_week = px.bar(sales_by_day_of_week, x='Day of Week', y='Total Amount', title='Sales by Day of the Week')
     
     return fig_sales_by_week
-def cumsum_sales_over_month():
-    filtered_df['Date'] = pd.to_datetime(filtered_df['Date']).sort_values(ascending=False)
-    filtered_df['Cumulative Sales'] = filtered_df['Total Amount'].cumsum()
-    cum_sales_over_time = filtered_df.groupby('Month')['Cumulative Sales'].sum().reset_index()
-    fig_cumulative_sales = px.line(cum_sales_over_time, x='Month', y='Cumulative Sales', title='Cumulative Sales Over Time')
+def cumsum_sales_over_time(granularity):
+    rollup = load_time_rollup(filtered_df, version, filter_key)
+    cum_sales_over_time = rollup.cumulative(granularity).rename('Cumulative Sales').reset_index()
+    fig_cumulative_sales = px.line(cum_sales_over_time, x=granularity, y='Cumulative Sales', title='Cumulative Sales Over Time')
     return fig_cumulative_sales
 
 ## -- LOAD SECTIONS TO PAGE -- ##
@@ -230,6 +285,7 @@ def load_section(section):
         st.markdown('---')
         selected_catergories_display()
         st.markdown('---')
+        monthly_kpis_display()
         
 
     elif section == "Customer Insights":
@@ -245,11 +301,11 @@ def load_section(section):
         # bar chart of sales
         col1, col2 = st.columns(2, gap='small', vertical_alignment='top')
         with col1:
-            st.plotly_chart(bar_chart_by_category())
+            st.plotly_chart(cached_figure('category_bar', bar_chart_by_category))
         with col2:
-            st.plotly_chart(pie_chart_by_gender())
+            st.plotly_chart(cached_figure('gender_pie', pie_chart_by_gender))
         
-        st.plotly_chart(subplots_chart())
+        st.plotly_chart(cached_figure('customer_insights', subplots_chart))
 
     elif section == "Time-based Trends":
         st.markdown(
@@ -261,12 +317,14 @@ def load_section(section):
         st.markdown('---')
         selected_catergories_display()
         st.markdown('---')
-        st.plotly_chart(sales_by_month())
-        st.plotly_chart(sales_by_day_of_the_week())
-        st.plotly_chart(cumsum_sales_over_month())
+        granularity = st.radio('Granularity', list(GRANULARITIES), index=2, horizontal=True)
+        st.plotly_chart(cached_figure(('sales_over_time', granularity), sales_over_time, granularity))
+        st.plotly_chart(cached_figure('sales_by_day_of_week', sales_by_day_of_the_week))
+        st.plotly_chart(cached_figure(('cumulative_sales', granularity), cumsum_sales_over_time, granularity))
         
     elif section == "Export to file":
         export_to_file()
 
 load_section(section)
 
+show_dataset_stats()